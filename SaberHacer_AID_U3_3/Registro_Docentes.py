@@ -1,10 +1,27 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
+from tkinter import ttk, messagebox, scrolledtext, filedialog, simpledialog
 import json
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
-import os
-from datetime import datetime
+import queue
+
+from nucleo_docentes import (NucleoDocentes, ErrorDocentes, ValidacionError,
+                             DocenteNoEncontradoError, DocenteDuplicadoError, ConflictoVersionError,
+                             validar_docente, validar_numero)
+from importador import importar
+from vista_resultados import CursorDocentes, VistaResultados
+from repositorio_docentes import TAMANO_NGRAMA
+from metricas import METRICAS, cronometrar
+
+# Milisegundos entre revisiones de las exportaciones terminadas
+INTERVALO_REVISION_EXPORTACIONES = 200
+# Milisegundos entre revisiones de los cambios hechos por otras instancias
+INTERVALO_SINCRONIZACION = 1000
+# Milisegundos sin escribir antes de lanzar la búsqueda en vivo
+RETARDO_BUSQUEDA = 250
+# Especialidades y días que se muestran en las estadísticas
+TOP_ESPECIALIDADES = 5
+DIAS_ESTADISTICAS = 7
+# Criterios del combo de búsqueda y su nombre en el núcleo
+CRITERIOS_INTERFAZ = {"Número": "numero", "Nombre": "nombre", "Especialidad": "especialidad"}
 
 class SistemaDocentes:
     def __init__(self, root):
@@ -13,9 +30,18 @@ class SistemaDocentes:
         self.root.geometry("1000x700")
         self.root.configure(bg='#f0f0f0')
         
-        # Lista para almacenar docentes
-        self.docentes = []
+        # Lógica de docentes compartida con el servidor HTTP; el avance de las
+        # exportaciones llega desde el hilo de exportación por esta cola
+        self.progreso_exportacion = queue.Queue()
+        self.avance_exportacion = {}
+        self.nucleo = NucleoDocentes(progreso=lambda *avance: self.progreso_exportacion.put(avance))
+        self.almacen = self.nucleo.almacen
         self.simular_errores = False
+        self.mostrar_exportacion = False
+        # (número, versión) del último docente consultado, para detectar cambios ajenos
+        self.consultado = None
+        # Búsqueda en vivo pendiente (identificador de root.after)
+        self.busqueda_programada = None
         
         # Cargar datos existentes
         self.cargar_datos_desde_json()
@@ -23,60 +49,87 @@ class SistemaDocentes:
         # Crear interfaz
         self.crear_interfaz()
         
+        # Terminar las exportaciones pendientes al cerrar la ventana
+        self.root.protocol("WM_DELETE_WINDOW", self.cerrar)
+        self.root.bind_all("<Control-z>", lambda evento: self.deshacer())
+        self.root.bind_all("<Control-y>", lambda evento: self.rehacer())
+        self.root.after(INTERVALO_REVISION_EXPORTACIONES, self.revisar_exportaciones)
+        self.root.after(INTERVALO_SINCRONIZACION, self.sincronizar)
+        
     def cargar_datos_desde_json(self):
-        """Carga los datos desde el archivo JSON si existe"""
+        """Carga la instantánea JSON si existe y reproduce el diario encima"""
         try:
-            if os.path.exists("docentes.json"):
-                with open("docentes.json", 'r', encoding='utf-8') as archivo:
-                    self.docentes = json.load(archivo)
-                print("✓ Datos cargados desde archivo JSON")
+            self.nucleo.cargar_datos_desde_json()
         except Exception as e:
             print(f"✗ Error al cargar datos: {e}")
+        # Los índices de búsqueda se construyen sin bloquear la ventana
+        self.nucleo.preparar_indices()
 
-    def guardar_datos(self):
-        """Guarda los datos en todos los formatos"""
-        self.generar_archivo_json()
-        self.generar_archivo_xml()
-        self.generar_archivo_yaml_simple()
-
-    def generar_archivo_json(self):
+    def revisar_exportaciones(self):
+        """Recoge en el hilo de la interfaz el avance y los resultados del exportador"""
+        avanzo = False
         try:
-            with open("docentes.json", 'w', encoding='utf-8') as archivo:
-                json.dump(self.docentes, archivo, indent=4, ensure_ascii=False)
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar JSON: {e}")
-            return False
-
-    def generar_archivo_xml(self):
+            while True:
+                formato, hechos, total, segundos = self.progreso_exportacion.get_nowait()
+                self.avance_exportacion[formato] = (hechos, total, segundos)
+                avanzo = True
+        except queue.Empty:
+            pass
+        if avanzo and self.mostrar_exportacion:
+            self.mostrar_resultado("⏳ Generando archivos en segundo plano...\n" + "\n".join(
+                f"   {formato}: {hechos}/{total} fragmentos ({segundos:.2f} s)"
+                for formato, (hechos, total, segundos) in self.avance_exportacion.items()))
         try:
-            root = ET.Element("docentes")
-            for docente in self.docentes:
-                docente_elem = ET.SubElement(root, "docente")
-                ET.SubElement(docente_elem, "nombre").text = docente["nombre"]
-                ET.SubElement(docente_elem, "especialidad").text = docente["especialidad"]
-                ET.SubElement(docente_elem, "numero_empleado").text = str(docente["numero_empleado"])
-            
-            xml_str = minidom.parseString(ET.tostring(root)).toprettyxml(indent="  ")
-            with open("docentes.xml", 'w', encoding='utf-8') as archivo:
-                archivo.write(xml_str)
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar XML: {e}")
-            return False
+            while True:
+                self.informar_exportacion(self.nucleo.exportaciones.resultados.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(INTERVALO_REVISION_EXPORTACIONES, self.revisar_exportaciones)
 
-    def generar_archivo_yaml_simple(self):
+    def sincronizar(self):
+        """Incorpora los cambios de otras instancias y refresca la vista si los hubo"""
         try:
-            with open("docentes.yaml", 'w', encoding='utf-8') as archivo:
-                archivo.write("docentes:\n")
-                for docente in self.docentes:
-                    archivo.write("  - nombre: " + docente['nombre'] + "\n")
-                    archivo.write("    especialidad: " + docente['especialidad'] + "\n")
-                    archivo.write("    numero_empleado: " + str(docente['numero_empleado']) + "\n")
-            return True
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al generar YAML: {e}")
-            return False
+            if self.nucleo.sincronizar():
+                self.actualizar_estado()
+                self.vista_resultados.refrescar()
+                # Si se abrió la instantánea de otra instancia, los índices se rehacen
+                self.nucleo.preparar_indices()
+        except (ErrorDocentes, OSError, ValueError) as e:
+            print(f"✗ Error al sincronizar: {e}")
+        self.root.after(INTERVALO_SINCRONIZACION, self.sincronizar)
+
+    def version_consultada(self, numero_empleado):
+        """Versión con la que se consultó el docente, o None si se consultó otro"""
+        if self.consultado is not None and self.consultado[0] == numero_empleado:
+            return self.consultado[1]
+        return None
+
+    def informar_exportacion(self, resultado):
+        """Muestra el resultado de una exportación terminada"""
+        if isinstance(resultado, Exception):
+            messagebox.showerror("Error", f"Error al exportar: {resultado}")
+            return
+        total, errores = resultado
+        for formato, error in errores.items():
+            messagebox.showerror("Error", f"Error al generar {formato}: {error}")
+        if not self.mostrar_exportacion:
+            return
+        self.mostrar_exportacion = False
+        
+        mensaje = "📁 ARCHIVOS GENERADOS:\n"
+        mensaje += f"✅ JSON: {'ERROR' if 'JSON' in errores else 'docentes.json'}\n"
+        mensaje += f"✅ XML: {'ERROR' if 'XML' in errores else 'docentes.xml'}\n"
+        mensaje += f"✅ YAML: {'ERROR' if 'YAML' in errores else 'docentes.yaml'}\n"
+        mensaje += f"📊 Total de registros: {total}\n"
+        mensaje += "⏱️ Tiempos: " + ", ".join(
+            f"{formato} {segundos:.2f} s" for formato, (_, _, segundos) in self.avance_exportacion.items())
+        
+        self.mostrar_resultado(mensaje)
+
+    def cerrar(self):
+        """Termina la exportación pendiente y cierra la aplicación"""
+        self.nucleo.cerrar()
+        self.root.destroy()
 
     def crear_interfaz(self):
         # Frame principal
@@ -147,6 +200,14 @@ class SistemaDocentes:
                   command=self.eliminar_docente).grid(row=0, column=3, padx=2)
         ttk.Button(btn_crud_frame, text="📋 Listar Todos", 
                   command=self.listar_docentes).grid(row=0, column=4, padx=2)
+        ttk.Button(btn_crud_frame, text="🏷️ Renombrar Especialidad", 
+                  command=self.renombrar_especialidad).grid(row=0, column=5, padx=2)
+        self.btn_deshacer = ttk.Button(btn_crud_frame, text="↩️ Deshacer", 
+                                       command=self.deshacer)
+        self.btn_deshacer.grid(row=0, column=6, padx=2)
+        self.btn_rehacer = ttk.Button(btn_crud_frame, text="↪️ Rehacer", 
+                                      command=self.rehacer)
+        self.btn_rehacer.grid(row=0, column=7, padx=2)
         
         # Búsqueda
         search_frame = ttk.Frame(crud_frame)
@@ -156,8 +217,12 @@ class SistemaDocentes:
         self.combo_busqueda = ttk.Combobox(search_frame, values=["Número", "Nombre", "Especialidad"], width=15)
         self.combo_busqueda.grid(row=0, column=1, padx=(0, 10))
         self.combo_busqueda.set("Número")
+        self.combo_busqueda.bind("<<ComboboxSelected>>", lambda evento: self.programar_busqueda())
         
-        self.entry_busqueda = ttk.Entry(search_frame, width=20)
+        # Buscar mientras se escribe, cuando se deja de teclear
+        self.texto_busqueda = tk.StringVar()
+        self.texto_busqueda.trace_add("write", lambda *argumentos: self.programar_busqueda())
+        self.entry_busqueda = ttk.Entry(search_frame, width=20, textvariable=self.texto_busqueda)
         self.entry_busqueda.grid(row=0, column=2, padx=(0, 10))
         
         ttk.Button(search_frame, text="🔎 Buscar", 
@@ -171,6 +236,10 @@ class SistemaDocentes:
                   command=self.generar_archivos).grid(row=0, column=0, padx=5)
         ttk.Button(archivos_frame, text="📊 Estadísticas", 
                   command=self.mostrar_estadisticas).grid(row=0, column=1, padx=5)
+        ttk.Button(archivos_frame, text="📥 Importar Archivo", 
+                  command=self.importar_archivo).grid(row=0, column=2, padx=5)
+        ttk.Button(archivos_frame, text="⏱️ Rendimiento", 
+                  command=self.mostrar_metricas).grid(row=0, column=3, padx=5)
         
         # Área de resultados
         resultados_frame = ttk.LabelFrame(main_frame, text="📊 Resultados", padding="10")
@@ -178,8 +247,15 @@ class SistemaDocentes:
         resultados_frame.columnconfigure(0, weight=1)
         resultados_frame.rowconfigure(0, weight=1)
         
-        self.text_resultados = scrolledtext.ScrolledText(resultados_frame, width=80, height=15)
-        self.text_resultados.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Pestañas: mensajes de las operaciones y tabla paginada de docentes
+        self.pestanas = ttk.Notebook(resultados_frame)
+        self.pestanas.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        self.text_resultados = scrolledtext.ScrolledText(self.pestanas, width=80, height=15)
+        self.pestanas.add(self.text_resultados, text="📝 Mensajes")
+        
+        self.vista_resultados = VistaResultados(self.pestanas, padding="5")
+        self.pestanas.add(self.vista_resultados, text="📋 Docentes")
         
         # Barra de estado
         self.status_var = tk.StringVar(value="Sistema listo - Total de docentes: 0")
@@ -211,19 +287,11 @@ class SistemaDocentes:
 
     def validar_campos(self):
         """Validar que los campos obligatorios estén llenos"""
-        if not self.entry_nombre.get().strip():
-            messagebox.showwarning("Validación", "El nombre es obligatorio")
-            return False
-        if not self.entry_especialidad.get().strip():
-            messagebox.showwarning("Validación", "La especialidad es obligatoria")
-            return False
-        if not self.entry_numero.get().strip():
-            messagebox.showwarning("Validación", "El número de empleado es obligatorio")
-            return False
         try:
-            int(self.entry_numero.get())
-        except ValueError:
-            messagebox.showwarning("Validación", "El número de empleado debe ser un número válido")
+            validar_docente(self.entry_nombre.get(), self.entry_especialidad.get(),
+                            self.entry_numero.get())
+        except ValidacionError as e:
+            messagebox.showwarning("Validación", str(e))
             return False
         return True
 
@@ -242,25 +310,20 @@ class SistemaDocentes:
             self.simular_error(400)
             return
         
-        numero_empleado = int(self.entry_numero.get())
-        
-        # Verificar si ya existe
-        if any(d['numero_empleado'] == numero_empleado for d in self.docentes):
-            messagebox.showerror("Error", "Ya existe un docente con ese número de empleado")
+        try:
+            docente = self.nucleo.agregar(self.entry_nombre.get(), self.entry_especialidad.get(),
+                                          self.entry_numero.get())
+        except DocenteDuplicadoError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al guardar en el diario: {e}")
             return
         
-        docente = {
-            "nombre": self.entry_nombre.get().strip(),
-            "especialidad": self.entry_especialidad.get().strip(),
-            "numero_empleado": numero_empleado,
-            "fecha_registro": datetime.now().isoformat()
-        }
-        
-        self.docentes.append(docente)
-        self.guardar_datos()
-        self.mostrar_resultado(f"✅ DOCENTE AGREGADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False)}")
+        self.mostrar_resultado(f"✅ DOCENTE AGREGADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False, default=dict)}")
         self.limpiar_campos()
         self.actualizar_estado()
+        self.vista_resultados.refrescar()
 
     def buscar_docente(self):
         """Buscar docente por número de empleado"""
@@ -273,16 +336,14 @@ class SistemaDocentes:
             return
         
         try:
-            numero = int(self.entry_numero.get())
-            docente = next((d for d in self.docentes if d['numero_empleado'] == numero), None)
-            
-            if docente:
-                self.mostrar_resultado(f"✅ DOCENTE ENCONTRADO:\n{json.dumps(docente, indent=2, ensure_ascii=False)}")
-            else:
-                self.mostrar_resultado("❌ No se encontró ningún docente con ese número de empleado")
-                
-        except ValueError:
-            messagebox.showerror("Error", "El número de empleado debe ser un número válido")
+            docente = self.nucleo.obtener(self.entry_numero.get())
+            self.consultado = (docente['numero_empleado'],
+                               self.nucleo.version_de(docente['numero_empleado']))
+            self.mostrar_resultado(f"✅ DOCENTE ENCONTRADO:\n{json.dumps(docente, indent=2, ensure_ascii=False, default=dict)}")
+        except DocenteNoEncontradoError:
+            self.mostrar_resultado("❌ No se encontró ningún docente con ese número de empleado")
+        except ValidacionError as e:
+            messagebox.showerror("Error", str(e))
 
     def buscar_docente_avanzado(self):
         """Búsqueda avanzada por diferentes criterios"""
@@ -297,21 +358,49 @@ class SistemaDocentes:
             self.simular_error(500)
             return
         
-        resultados = []
-        if criterio == "Número":
-            try:
-                numero = int(valor)
-                resultados = [d for d in self.docentes if d['numero_empleado'] == numero]
-            except ValueError:
-                messagebox.showerror("Error", "El número de empleado debe ser un número válido")
+        try:
+            resultados = self.nucleo.buscar_avanzado(CRITERIOS_INTERFAZ.get(criterio, criterio), valor)
+        except ValidacionError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.mostrar_busqueda(resultados)
+
+    def programar_busqueda(self):
+        """Reinicia la espera de la búsqueda en vivo con cada cambio del texto"""
+        if self.busqueda_programada is not None:
+            self.root.after_cancel(self.busqueda_programada)
+        self.busqueda_programada = self.root.after(RETARDO_BUSQUEDA, self.buscar_mientras_escribe)
+
+    def buscar_mientras_escribe(self):
+        """Búsqueda en vivo: sin avisos, se ignora lo que todavía no es una consulta válida
+
+        Los textos de nombre o especialidad más cortos que un trigrama no se
+        buscan solos (recorrerían todos los docentes); para eso está el
+        botón 🔎. Mientras los índices se construyen, la búsqueda se pospone.
+        """
+        self.busqueda_programada = None
+        valor = self.entry_busqueda.get().strip()
+        if not valor or self.simular_errores:
+            return
+        criterio = CRITERIOS_INTERFAZ.get(self.combo_busqueda.get(), self.combo_busqueda.get())
+        if criterio != "numero":
+            if len(valor) < TAMANO_NGRAMA:
                 return
-        elif criterio == "Nombre":
-            resultados = [d for d in self.docentes if valor.lower() in d['nombre'].lower()]
-        elif criterio == "Especialidad":
-            resultados = [d for d in self.docentes if valor.lower() in d['especialidad'].lower()]
-        
+            if not self.nucleo.indices_listos:
+                self.nucleo.preparar_indices()
+                self.programar_busqueda()
+                return
+        try:
+            resultados = self.nucleo.buscar_avanzado(criterio, valor)
+        except ValidacionError:
+            return
+        self.mostrar_busqueda(resultados)
+
+    def mostrar_busqueda(self, resultados):
+        """Mostrar los resultados de la búsqueda avanzada"""
         if resultados:
-            self.mostrar_resultado(f"✅ {len(resultados)} DOCENTE(S) ENCONTRADO(S):\n{json.dumps(resultados, indent=2, ensure_ascii=False)}")
+            cursor = CursorDocentes(self.almacen, [d['numero_empleado'] for d in resultados])
+            self.mostrar_docentes(cursor, f"✅ {len(resultados)} DOCENTE(S) ENCONTRADO(S)")
         else:
             self.mostrar_resultado("❌ No se encontraron docentes con los criterios especificados")
 
@@ -326,31 +415,23 @@ class SistemaDocentes:
             return
         
         try:
-            numero = int(self.entry_numero.get())
-            docente = next((d for d in self.docentes if d['numero_empleado'] == numero), None)
-            
-            if not docente:
-                messagebox.showerror("Error", "No se encontró un docente con ese número de empleado")
-                return
-            
-            # Actualizar campos si se proporcionaron nuevos valores
-            nuevo_nombre = self.entry_nombre.get().strip()
-            nueva_especialidad = self.entry_especialidad.get().strip()
-            
-            if nuevo_nombre:
-                docente['nombre'] = nuevo_nombre
-            if nueva_especialidad:
-                docente['especialidad'] = nueva_especialidad
-            
-            docente['fecha_actualizacion'] = datetime.now().isoformat()
-            self.guardar_datos()
-            
-            self.mostrar_resultado(f"✅ DOCENTE ACTUALIZADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False)}")
-            self.limpiar_campos()
-            self.actualizar_estado()
-            
-        except ValueError:
-            messagebox.showerror("Error", "El número de empleado debe ser un número válido")
+            # Solo se actualizan los campos con valores nuevos; si el docente se
+            # consultó antes, falla en caso de que otra instancia lo haya cambiado
+            numero = validar_numero(self.entry_numero.get())
+            docente = self.nucleo.actualizar(numero, self.entry_nombre.get(),
+                                             self.entry_especialidad.get(),
+                                             self.version_consultada(numero))
+        except (DocenteNoEncontradoError, ValidacionError, ConflictoVersionError) as e:
+            messagebox.showerror("Error", str(e))
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al guardar en el diario: {e}")
+            return
+        
+        self.mostrar_resultado(f"✅ DOCENTE ACTUALIZADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False, default=dict)}")
+        self.limpiar_campos()
+        self.actualizar_estado()
+        self.vista_resultados.refrescar()
 
     def eliminar_docente(self):
         """Eliminar un docente"""
@@ -363,12 +444,8 @@ class SistemaDocentes:
             return
         
         try:
-            numero = int(self.entry_numero.get())
-            docente = next((d for d in self.docentes if d['numero_empleado'] == numero), None)
-            
-            if not docente:
-                messagebox.showerror("Error", "No se encontró un docente con ese número de empleado")
-                return
+            docente = self.nucleo.obtener(self.entry_numero.get())
+            version = self.nucleo.version_de(docente['numero_empleado'])
             
             # Confirmar eliminación
             respuesta = messagebox.askyesno(
@@ -380,14 +457,71 @@ class SistemaDocentes:
             )
             
             if respuesta:
-                self.docentes = [d for d in self.docentes if d['numero_empleado'] != numero]
-                self.guardar_datos()
-                self.mostrar_resultado(f"✅ DOCENTE ELIMINADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False)}")
+                self.nucleo.eliminar(docente['numero_empleado'], version)
+                self.mostrar_resultado(f"✅ DOCENTE ELIMINADO EXITOSAMENTE:\n{json.dumps(docente, indent=2, ensure_ascii=False, default=dict)}")
                 self.limpiar_campos()
                 self.actualizar_estado()
+                self.vista_resultados.refrescar()
                 
-        except ValueError:
-            messagebox.showerror("Error", "El número de empleado debe ser un número válido")
+        except (DocenteNoEncontradoError, ValidacionError, ConflictoVersionError) as e:
+            messagebox.showerror("Error", str(e))
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al guardar en el diario: {e}")
+
+    def renombrar_especialidad(self):
+        """Cambiar la especialidad de todos sus docentes en una sola operación"""
+        actual = simpledialog.askstring("Renombrar Especialidad", "Especialidad actual:", parent=self.root)
+        if not actual:
+            return
+        nueva = simpledialog.askstring("Renombrar Especialidad", f"Nuevo nombre para «{actual}»:",
+                                       parent=self.root)
+        if not nueva:
+            return
+        
+        try:
+            renombrados = self.nucleo.renombrar_especialidad(actual, nueva)
+        except ErrorDocentes as e:
+            messagebox.showerror("Error", str(e))
+            return
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al guardar en el diario: {e}")
+            return
+        
+        if renombrados:
+            self.mostrar_resultado(f"✅ ESPECIALIDAD RENOMBRADA:\n{actual} → {nueva.strip()}\n"
+                                   f"📊 Docentes actualizados: {renombrados}")
+        else:
+            self.mostrar_resultado(f"❌ No hay docentes con la especialidad {actual}")
+        self.actualizar_estado()
+        self.vista_resultados.refrescar()
+
+    def deshacer(self):
+        """Deshacer la última operación (un docente o una transacción completa)"""
+        self._recorrer_historial(self.nucleo.deshacer, "↩️ OPERACIÓN DESHECHA", "No hay operaciones para deshacer")
+
+    def rehacer(self):
+        """Rehacer la última operación deshecha"""
+        self._recorrer_historial(self.nucleo.rehacer, "↪️ OPERACIÓN REHECHA", "No hay operaciones para rehacer")
+
+    def _recorrer_historial(self, accion, titulo, sin_cambios):
+        try:
+            cambiados = accion()
+        except ConflictoVersionError as e:
+            # La operación se quitó del historial: las anteriores siguen disponibles
+            messagebox.showwarning("Historial", f"{e}\n\nLa operación se quitó del historial.")
+            self.actualizar_estado()
+            self.vista_resultados.refrescar()
+            return
+        except (ErrorDocentes, OSError) as e:
+            messagebox.showerror("Error", f"No se pudo completar la operación: {e}")
+            return
+        
+        if not cambiados:
+            self.mostrar_resultado(f"📝 {sin_cambios}")
+            return
+        self.mostrar_resultado(f"{titulo}:\n📊 Docentes afectados: {cambiados}")
+        self.actualizar_estado()
+        self.vista_resultados.refrescar()
 
     def listar_docentes(self):
         """Listar todos los docentes"""
@@ -395,11 +529,12 @@ class SistemaDocentes:
             self.simular_error(500)
             return
         
-        if not self.docentes:
+        if not len(self.almacen):
             self.mostrar_resultado("📝 No hay docentes registrados en el sistema")
             return
         
-        self.mostrar_resultado(f"📋 LISTA COMPLETA DE DOCENTES ({len(self.docentes)}):\n{json.dumps(self.docentes, indent=2, ensure_ascii=False)}")
+        self.mostrar_docentes(CursorDocentes(self.almacen),
+                              f"📋 LISTA COMPLETA DE DOCENTES ({len(self.almacen)})")
 
     def generar_archivos(self):
         """Generar todos los archivos de exportación"""
@@ -407,49 +542,99 @@ class SistemaDocentes:
             self.simular_error(502)
             return
         
-        json_ok = self.generar_archivo_json()
-        xml_ok = self.generar_archivo_xml()
-        yaml_ok = self.generar_archivo_yaml_simple()
+        self.mostrar_exportacion = True
+        self.avance_exportacion = {}
+        self.nucleo.exportaciones.solicitar(inmediato=True)
+        self.mostrar_resultado("⏳ Generando archivos en segundo plano...")
+
+    def importar_archivo(self):
+        """Importar docentes en bloque desde un archivo JSON, XML, YAML o CSV"""
+        if self.simular_errores:
+            self.simular_error(400)
+            return
         
-        mensaje = "📁 ARCHIVOS GENERADOS:\n"
-        mensaje += f"✅ JSON: {'docentes.json' if json_ok else 'ERROR'}\n"
-        mensaje += f"✅ XML: {'docentes.xml' if xml_ok else 'ERROR'}\n"
-        mensaje += f"✅ YAML: {'docentes.yaml' if yaml_ok else 'ERROR'}\n"
-        mensaje += f"📊 Total de registros: {len(self.docentes)}"
+        ruta = filedialog.askopenfilename(
+            title="Importar docentes",
+            filetypes=[("Docentes", "*.json *.xml *.yaml *.yml *.csv"), ("Todos", "*.*")])
+        if not ruta:
+            return
         
-        self.mostrar_resultado(mensaje)
+        try:
+            informe = importar(self.nucleo, ruta)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al importar: {e}")
+            return
+        
+        self.mostrar_resultado(informe.resumen())
+        self.actualizar_estado()
+        self.vista_resultados.refrescar()
 
     def mostrar_estadisticas(self):
         """Mostrar estadísticas del sistema"""
-        total = len(self.docentes)
-        especialidades = {}
-        
-        for docente in self.docentes:
-            esp = docente['especialidad']
-            especialidades[esp] = especialidades.get(esp, 0) + 1
+        resumen = self.nucleo.resumen_estadisticas(TOP_ESPECIALIDADES)
         
         mensaje = "📊 ESTADÍSTICAS DEL SISTEMA:\n"
-        mensaje += f"📈 Total de docentes: {total}\n"
+        mensaje += f"📈 Total de docentes: {resumen['total']}\n"
         mensaje += f"🔧 Simulación de errores: {'ACTIVA' if self.simular_errores else 'INACTIVA'}\n"
         mensaje += "\n📚 Distribución por especialidad:\n"
         
-        for esp, cantidad in especialidades.items():
-            porcentaje = (cantidad / total) * 100 if total > 0 else 0
-            mensaje += f"   • {esp}: {cantidad} ({porcentaje:.1f}%)\n"
+        for esp, datos in resumen['por_especialidad'].items():
+            mensaje += f"   • {esp}: {datos['cantidad']} ({datos['porcentaje']:.1f}%)\n"
+        
+        mensaje += f"\n🏆 Top {TOP_ESPECIALIDADES} especialidades:\n"
+        for posicion, datos in enumerate(resumen['top'], start=1):
+            mensaje += f"   {posicion}. {datos['especialidad']}: {datos['cantidad']}\n"
+        
+        por_dia = list(resumen['registros_por_dia'].items())[-DIAS_ESTADISTICAS:]
+        mensaje += f"\n📅 Registros por día (últimos {len(por_dia)}):\n"
+        for dia, cantidad in por_dia:
+            mensaje += f"   • {dia}: {cantidad}\n"
+        
+        self.mostrar_resultado(mensaje)
+
+    def mostrar_metricas(self):
+        """Mostrar latencias, contadores y bytes escritos por operación"""
+        if not METRICAS.activas:
+            METRICAS.activar()
+            self.mostrar_resultado("⏱️ Métricas de rendimiento activadas.\n"
+                                   "Se registrarán las operaciones a partir de ahora.")
+            return
+        
+        metricas = METRICAS.instantanea()
+        mensaje = "⏱️ RENDIMIENTO DE LAS OPERACIONES:\n"
+        mensaje += f"{'Operación':<28}{'Cuenta':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'máx ms':>10}\n"
+        for operacion, datos in metricas['operaciones'].items():
+            mensaje += (f"{operacion:<28}{datos['cuenta']:>8}{datos['p50_ms']:>10.3f}"
+                        f"{datos['p95_ms']:>10.3f}{datos['p99_ms']:>10.3f}{datos['max_ms']:>10.3f}\n")
+        
+        mensaje += "\n📦 Contadores:\n"
+        for contador, valor in metricas['contadores'].items():
+            mensaje += f"   • {contador}: {valor}\n"
         
         self.mostrar_resultado(mensaje)
 
+    @cronometrar("interfaz:mostrar_resultado")
     def mostrar_resultado(self, mensaje):
         """Mostrar resultado en el área de texto"""
         self.text_resultados.delete(1.0, tk.END)
         self.text_resultados.insert(tk.END, mensaje)
         self.text_resultados.see(tk.END)
+        self.pestanas.select(self.text_resultados)
+
+    @cronometrar("interfaz:mostrar_docentes")
+    def mostrar_docentes(self, cursor, titulo):
+        """Mostrar un conjunto de docentes en la tabla paginada"""
+        self.vista_resultados.mostrar(cursor, titulo)
+        self.pestanas.select(self.vista_resultados)
 
     def actualizar_estado(self):
-        """Actualizar la barra de estado"""
-        total = len(self.docentes)
+        """Actualizar la barra de estado y los botones de deshacer y rehacer"""
+        total = len(self.almacen)
         estado_errores = "ACTIVA" if self.simular_errores else "inactiva"
         self.status_var.set(f"Sistema listo - Docentes: {total} - Simulación de errores: {estado_errores}")
+        historial = self.nucleo.historial
+        self.btn_deshacer.state(["!disabled"] if historial.puede_deshacer else ["disabled"])
+        self.btn_rehacer.state(["!disabled"] if historial.puede_rehacer else ["disabled"])
 
 def main():
     """Función principal"""
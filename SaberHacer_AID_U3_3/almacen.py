@@ -0,0 +1,456 @@
+import json
+import os
+
+from errores_docentes import DocenteDuplicadoError, ConflictoVersionError
+from repositorio_docentes import RepositorioDocentes
+from persistencia import DiarioDocentes, aplicar_entrada, numeros_entrada
+from instantanea_binaria import (RUTA_BINARIA, InstantaneaBinaria, escribir_instantanea_binaria,
+                                 version_instantanea)
+from exportador import RUTA_JSON, generar_exportaciones
+from bloqueo_archivo import BloqueoArchivo
+
+# Variable de entorno que elige el almacenamiento ("archivos" o "sqlite")
+VARIABLE_ALMACEN = "DOCENTES_ALMACEN"
+ALMACEN_POR_DEFECTO = "archivos"
+# Archivos de bloqueo compartidos por las instancias que usan el mismo directorio
+RUTA_BLOQUEO = "docentes.lock"
+RUTA_BLOQUEO_EXPORTACION = "docentes.export.lock"
+
+
+class AlmacenDocentes:
+    """Interfaz común de los almacenamientos de docentes
+
+    Los docentes se manejan como diccionarios con al menos `nombre`,
+    `especialidad` y `numero_empleado`. Cada mutación queda persistida al
+    volver del método.
+
+    Varias instancias de la aplicación pueden usar los mismos datos: cada
+    docente tiene una versión (`version_de`) que cambia con cada mutación,
+    y las mutaciones que reciben la versión consultada fallan con
+    ConflictoVersionError si otra instancia lo cambió entretanto.
+    """
+
+    # Si es verdadero, el núcleo programa una exportación tras cada cambio;
+    # si no, los archivos solo se generan cuando se piden
+    exporta_tras_cambios = True
+
+    def cargar(self):
+        """Abre los datos persistidos; devuelve cuántas operaciones recuperó"""
+        raise NotImplementedError
+
+    def cerrar(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def existe(self, numero_empleado):
+        return self.obtener(numero_empleado) is not None
+
+    def obtener(self, numero_empleado):
+        """Devuelve el docente con ese número o None"""
+        raise NotImplementedError
+
+    def agregar(self, docente):
+        """Agrega un docente nuevo; devuelve False si el número ya existe"""
+        raise NotImplementedError
+
+    def agregar_lote(self, docentes):
+        """Agrega varios docentes nuevos: todos o ninguno (DocenteDuplicadoError)"""
+        raise NotImplementedError
+
+    def actualizar(self, numero_empleado, cambios, version=None):
+        """Aplica los cambios y devuelve el docente resultante (None si no existe)"""
+        raise NotImplementedError
+
+    def eliminar(self, numero_empleado, version=None):
+        """Elimina el docente y lo devuelve (None si no existe)"""
+        raise NotImplementedError
+
+    def aplicar_cambios(self, cambios, versiones=None):
+        """Aplica pares (numero_empleado, docente) en una sola escritura, todo o nada
+
+        Cada docente reemplaza completo al que tenga ese número (o se agrega);
+        None lo elimina. `versiones` asocia números con la versión esperada
+        (None: el docente no debía existir).
+        """
+        raise NotImplementedError
+
+    def version_de(self, numero_empleado):
+        """Versión actual del docente, o None si no existe"""
+        raise NotImplementedError
+
+    def sincronizar(self):
+        """Incorpora los cambios de otras instancias; devuelve cuántos hubo (0 si ninguno)"""
+        raise NotImplementedError
+
+    @property
+    def version_datos(self):
+        """Número que cambia con cada modificación visible, propia o de otra instancia"""
+        raise NotImplementedError
+
+    def listar(self):
+        """Itera los docentes en orden de inserción"""
+        raise NotImplementedError
+
+    def numeros(self):
+        """Itera los números de empleado en orden de inserción"""
+        raise NotImplementedError
+
+    def pagina(self, inicio, cantidad, orden=None):
+        """Docentes de una página del listado
+
+        `orden` es un par (columna, descendente) para paginar ordenando por
+        esa columna en lugar de por orden de inserción.
+        """
+        raise NotImplementedError
+
+    def buscar_por_nombre(self, texto):
+        raise NotImplementedError
+
+    def buscar_por_especialidad(self, texto):
+        raise NotImplementedError
+
+    @property
+    def indices_listos(self):
+        """Indica si las búsquedas ya no tienen que construir índices en memoria"""
+        return True
+
+    def preparar_indices(self):
+        """Construye los índices de búsqueda en memoria que falten (en otro hilo)"""
+
+    @property
+    def estadisticas(self):
+        """Objeto con total, conteos(), porcentajes(), top(n) y registros_por_dia()"""
+        raise NotImplementedError
+
+    def exportar(self, progreso=None):
+        """Genera JSON, XML y YAML; devuelve (total, errores por formato)
+
+        Se ejecuta en el hilo de exportación. `progreso` se pasa a
+        `exportador.generar_exportaciones`.
+        """
+        raise NotImplementedError
+
+    def __iter__(self):
+        return self.listar()
+
+
+class AlmacenArchivos(AlmacenDocentes):
+    """Almacenamiento por defecto: repositorio en memoria, diario e instantáneas
+
+    Las mutaciones se anexan al diario; la exportación en segundo plano
+    escribe la instantánea binaria, el JSON, el XML y el YAML.
+
+    Las instancias que comparten el directorio se coordinan con bloqueos de
+    archivo: cada mutación aplica primero lo que las demás anexaron al
+    diario y luego anexa la suya con la versión siguiente, y las
+    exportaciones se hacen de a una, siempre con los datos al día.
+    """
+
+    def __init__(self):
+        self.repositorio = RepositorioDocentes()
+        self.diario = DiarioDocentes()
+        # Protege repositorio y diario frente al hilo de exportación y a otros procesos
+        self.bloqueo = BloqueoArchivo(RUTA_BLOQUEO)
+        # Hace que las instancias exporten de a una
+        self.bloqueo_exportacion = BloqueoArchivo(RUTA_BLOQUEO_EXPORTACION)
+        # Última versión aplicada, la de la instantánea y la de cada docente cambiado después
+        self.version = 0
+        self._version_base = 0
+        self._versiones = {}
+        # Estado de los archivos en la última sincronización
+        self._firma = None
+        # (orden, versión, números) del último listado ordenado que se pidió
+        self._ordenados = None
+
+    def cargar(self):
+        """Abre la instantánea y reproduce el diario encima
+
+        La instantánea binaria se abre sin decodificar los docentes; el JSON
+        solo se lee completo si no hay instantánea binaria o no es válida.
+        """
+        with self.bloqueo:
+            base = None
+            if os.path.exists(RUTA_BINARIA):
+                try:
+                    base = InstantaneaBinaria(RUTA_BINARIA)
+                except (OSError, ValueError) as e:
+                    print(f"✗ No se pudo abrir la instantánea binaria: {e}")
+            if base is not None:
+                self._abrir_base(base)
+                print(f"✓ Instantánea binaria abierta ({len(base)} docentes)")
+            elif os.path.exists(RUTA_JSON):
+                with open(RUTA_JSON, 'r', encoding='utf-8') as archivo:
+                    self.repositorio.cargar(json.load(archivo))
+                print("✓ Datos cargados desde archivo JSON")
+            aplicadas = self._ponerse_al_dia()
+        if aplicadas:
+            print(f"✓ {aplicadas} operaciones recuperadas del diario")
+        return aplicadas
+
+    def _abrir_base(self, base):
+        self.repositorio.abrir_base(base)
+        self.version = self._version_base = base.version
+        self._versiones.clear()
+
+    def _firma_archivos(self):
+        """Inodo, tamaño y fecha de diario, segmento rotado e instantánea"""
+        firma = []
+        for ruta in (self.diario.ruta, self.diario.ruta_rotada, RUTA_BINARIA):
+            try:
+                estado = os.stat(ruta)
+                firma.append((estado.st_ino, estado.st_size, estado.st_mtime_ns))
+            except FileNotFoundError:
+                firma.append(None)
+        return tuple(firma)
+
+    def _ponerse_al_dia(self):
+        """Aplica lo que otras instancias anexaron al diario (con `bloqueo` tomado)
+
+        Si otra instancia ya compactó en su instantánea operaciones que aquí
+        faltan (la instantánea es más nueva, o el diario salta versiones), se
+        abre esa instantánea y se aplica el diario completo encima; la
+        comprobación se hace antes de aplicar nada del diario.
+        """
+        firma = self._firma_archivos()
+        if firma == self._firma:
+            return 0
+        base, entradas = self._pendientes()
+        if base is not None:
+            self._abrir_base(base)
+            aplicadas = 1 + self._aplicar_diario(entradas)
+        else:
+            aplicadas = self._aplicar_diario(entradas)
+        self._firma = self._firma_archivos()
+        return aplicadas
+
+    def _pendientes(self):
+        """Lo que falta para ponerse al día, sin aplicarlo (con `bloqueo` tomado)
+
+        Devuelve la instantánea que hay que abrir antes (o None) y las
+        entradas del diario que van encima.
+        """
+        entradas = self.diario.leer(self.version)
+        version_disco = version_instantanea(RUTA_BINARIA)
+        hueco = bool(entradas) and entradas[0][0] > self.version + 1
+        if version_disco is not None and (version_disco > self.version or hueco):
+            base = InstantaneaBinaria(RUTA_BINARIA)
+            return base, self.diario.leer(base.version, completo=True)
+        return None, entradas
+
+    def _copia_al_dia(self):
+        """Vista de los datos con los cambios ajenos y su versión, sin tocar el repositorio vivo"""
+        base, entradas = self._pendientes()
+        if base is not None:
+            copia = RepositorioDocentes()
+            copia.abrir_base(base)
+            version = base.version
+        else:
+            copia = self.repositorio.copiar()
+            version = self.version
+        for version, entrada in entradas:
+            aplicar_entrada(copia, entrada)
+        return copia.congelar(), version
+
+    def _aplicar_diario(self, entradas):
+        for version, entrada in entradas:
+            aplicar_entrada(self.repositorio, entrada)
+            for numero in numeros_entrada(entrada):
+                self._versiones[numero] = version
+            self.version = version
+        return len(entradas)
+
+    def _anotar(self, numeros, escribir):
+        """Anexa una mutación ya aplicada con la versión siguiente (con `bloqueo` tomado)"""
+        version = self.version + 1
+        escribir(version)
+        self.version = version
+        for numero in numeros:
+            self._versiones[numero] = version
+        self._firma = self._firma_archivos()
+
+    def _verificar(self, versiones):
+        for numero, esperada in versiones.items():
+            if self.version_de(numero) != esperada:
+                raise ConflictoVersionError(
+                    f"El docente {numero} fue modificado en otra instancia; vuelva a consultarlo")
+
+    @property
+    def version_datos(self):
+        return self.version
+
+    def version_de(self, numero_empleado):
+        if not self.repositorio.existe(numero_empleado):
+            return None
+        return self._versiones.get(numero_empleado, self._version_base)
+
+    def sincronizar(self):
+        if self._firma_archivos() == self._firma:
+            return 0
+        with self.bloqueo:
+            return self._ponerse_al_dia()
+
+    def cerrar(self):
+        pass
+
+    def __len__(self):
+        return len(self.repositorio)
+
+    def obtener(self, numero_empleado):
+        return self.repositorio.obtener(numero_empleado)
+
+    def existe(self, numero_empleado):
+        return self.repositorio.existe(numero_empleado)
+
+    def agregar(self, docente):
+        with self.bloqueo:
+            self._ponerse_al_dia()
+            if not self.repositorio.agregar(docente):
+                return False
+            self._anotar([docente['numero_empleado']],
+                         lambda version: self.diario.registrar("guardar", docente, version))
+        return True
+
+    def agregar_lote(self, docentes):
+        agregados = []
+        with self.bloqueo:
+            self._ponerse_al_dia()
+            try:
+                for docente in docentes:
+                    if not self.repositorio.agregar(docente):
+                        raise DocenteDuplicadoError(
+                            f"Ya existe un docente con el número {docente['numero_empleado']}")
+                    agregados.append(docente)
+                if agregados:
+                    self._anotar([d['numero_empleado'] for d in agregados],
+                                 lambda version: self.diario.registrar_lote(agregados, version))
+            except BaseException:
+                for docente in agregados:
+                    self.repositorio.eliminar(docente['numero_empleado'])
+                raise
+        return len(agregados)
+
+    def actualizar(self, numero_empleado, cambios, version=None):
+        with self.bloqueo:
+            self._ponerse_al_dia()
+            if version is not None:
+                self._verificar({numero_empleado: version})
+            docente = self.repositorio.actualizar(numero_empleado, cambios)
+            if docente is not None:
+                self._anotar([numero_empleado],
+                             lambda version: self.diario.registrar("guardar", docente, version))
+        return docente
+
+    def eliminar(self, numero_empleado, version=None):
+        with self.bloqueo:
+            self._ponerse_al_dia()
+            if version is not None:
+                self._verificar({numero_empleado: version})
+            docente = self.repositorio.eliminar(numero_empleado)
+            if docente is not None:
+                self._anotar([numero_empleado],
+                             lambda version: self.diario.registrar("eliminar", docente, version))
+        return docente
+
+    def aplicar_cambios(self, cambios, versiones=None):
+        aplicados = []
+        with self.bloqueo:
+            self._ponerse_al_dia()
+            if versiones:
+                self._verificar(versiones)
+            try:
+                for numero, docente in cambios:
+                    aplicados.append((numero, self._poner(numero, docente)))
+                self._anotar([numero for numero, _ in cambios],
+                             lambda version: self.diario.registrar_transaccion(cambios, version))
+            except BaseException:
+                for numero, anterior in reversed(aplicados):
+                    self._poner(numero, anterior)
+                raise
+
+    def _poner(self, numero_empleado, docente):
+        """Deja el docente con ese número (None lo elimina); devuelve el anterior"""
+        if docente is None:
+            return self.repositorio.eliminar(numero_empleado)
+        return self.repositorio.reemplazar(docente)
+
+    def listar(self):
+        return self.repositorio.listar()
+
+    def numeros(self):
+        return self.repositorio.numeros()
+
+    def pagina(self, inicio, cantidad, orden=None):
+        if orden is None:
+            return self.repositorio.pagina(inicio, cantidad)
+        # El orden se recalcula solo cuando cambian los datos
+        if self._ordenados is None or self._ordenados[:2] != (orden, self.version):
+            self._ordenados = (orden, self.version, self.repositorio.numeros_ordenados(*orden))
+        numeros = self._ordenados[2][inicio:inicio + cantidad]
+        return [self.repositorio.obtener(n) for n in numeros]
+
+    def buscar_por_nombre(self, texto):
+        return self.repositorio.buscar_por_nombre(texto)
+
+    def buscar_por_especialidad(self, texto):
+        return self.repositorio.buscar_por_especialidad(texto)
+
+    @property
+    def indices_listos(self):
+        return self.repositorio.indices_listos
+
+    def preparar_indices(self):
+        self.repositorio.preparar_indices(self.bloqueo)
+
+    @property
+    def estadisticas(self):
+        return self.repositorio.estadisticas
+
+    def exportar(self, progreso=None):
+        """Escribe la instantánea y las exportaciones (hilo de exportación)
+
+        La vista del repositorio y la rotación del diario se toman juntas,
+        así que toda operación que no entre en la instantánea queda en el
+        diario nuevo. El segmento rotado solo se descarta cuando la
+        instantánea binaria, que es la que se abre al iniciar, quedó escrita.
+        Las instancias exportan de a una, así que un archivo nunca queda
+        pisado por una exportación más vieja.
+
+        Los cambios de otras instancias se incluyen aplicándolos a una copia:
+        el repositorio vivo solo lo modifica el hilo que lo usa, que los
+        incorpora en su próxima sincronización.
+        """
+        with self.bloqueo_exportacion:
+            with self.bloqueo:
+                if self._firma_archivos() == self._firma:
+                    docentes = self.repositorio.congelar()
+                    version = self.version
+                    self.diario.rotar()
+                    self._firma = self._firma_archivos()
+                else:
+                    docentes, version = self._copia_al_dia()
+                    # Sin actualizar la firma, la próxima sincronización
+                    # incorpora lo ajeno (ya rotado o en la instantánea)
+                    self.diario.rotar()
+            errores = {}
+            try:
+                escribir_instantanea_binaria(docentes, version=version)
+            except Exception as e:
+                errores["BIN"] = e
+            errores.update(generar_exportaciones(docentes, progreso))
+            if "BIN" not in errores:
+                with self.bloqueo:
+                    self.diario.descartar_rotado()
+        return len(docentes), errores
+
+
+def crear_almacen(nombre=None):
+    """Crea el almacenamiento indicado, o el de DOCENTES_ALMACEN, o el de archivos"""
+    nombre = (nombre or os.environ.get(VARIABLE_ALMACEN) or ALMACEN_POR_DEFECTO).lower()
+    if nombre == "archivos":
+        return AlmacenArchivos()
+    if nombre == "sqlite":
+        from almacen_sqlite import AlmacenSQLite
+        return AlmacenSQLite()
+    raise ValueError(f"Almacenamiento desconocido: {nombre}")
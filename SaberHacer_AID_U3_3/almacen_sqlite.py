@@ -0,0 +1,358 @@
+import json
+import os
+import sqlite3
+
+from almacen import AlmacenDocentes, RUTA_BLOQUEO_EXPORTACION
+from errores_docentes import DocenteDuplicadoError, ConflictoVersionError
+from bloqueo_archivo import BloqueoArchivo
+from repositorio_docentes import normalizar, TAMANO_NGRAMA
+from exportador import RUTA_JSON, generar_exportaciones
+
+RUTA_SQLITE = "docentes.db"
+# Sentencias preparadas que sqlite3 conserva por conexión
+SENTENCIAS_EN_CACHE = 64
+
+# Columnas propias; cualquier otra clave del docente se guarda en `extra`
+CAMPOS = ("nombre", "especialidad", "numero_empleado", "fecha_registro", "fecha_actualizacion")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS docentes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    numero_empleado INTEGER NOT NULL,
+    nombre TEXT NOT NULL,
+    especialidad TEXT NOT NULL,
+    fecha_registro TEXT,
+    fecha_actualizacion TEXT,
+    extra TEXT,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO meta (clave, valor) VALUES ('version', 0);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_docentes_numero ON docentes (numero_empleado);
+CREATE INDEX IF NOT EXISTS ix_docentes_especialidad ON docentes (especialidad, id);
+CREATE INDEX IF NOT EXISTS ix_docentes_dia ON docentes (substr(fecha_registro, 1, 10));
+"""
+
+# Índice de texto completo con trigramas sincronizado por disparadores
+ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docentes_fts USING fts5(
+    nombre, content='docentes', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS docentes_fts_ai AFTER INSERT ON docentes BEGIN
+    INSERT INTO docentes_fts (rowid, nombre) VALUES (new.id, new.nombre);
+END;
+CREATE TRIGGER IF NOT EXISTS docentes_fts_ad AFTER DELETE ON docentes BEGIN
+    INSERT INTO docentes_fts (docentes_fts, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+END;
+CREATE TRIGGER IF NOT EXISTS docentes_fts_au AFTER UPDATE OF nombre ON docentes BEGIN
+    INSERT INTO docentes_fts (docentes_fts, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+    INSERT INTO docentes_fts (rowid, nombre) VALUES (new.id, new.nombre);
+END;
+"""
+
+COLUMNAS = "nombre, especialidad, numero_empleado, fecha_registro, fecha_actualizacion, extra"
+SQL_OBTENER = f"SELECT {COLUMNAS} FROM docentes WHERE numero_empleado = ?"
+SQL_INSERTAR = """INSERT INTO docentes (version, nombre, especialidad, fecha_registro,
+    fecha_actualizacion, extra, numero_empleado) VALUES (?, ?, ?, ?, ?, ?, ?)"""
+SQL_ACTUALIZAR = """UPDATE docentes SET version = ?, nombre = ?, especialidad = ?, fecha_registro = ?,
+    fecha_actualizacion = ?, extra = ? WHERE numero_empleado = ?"""
+SQL_VERSION_DOCENTE = "SELECT version FROM docentes WHERE numero_empleado = ?"
+SQL_SUBIR_VERSION = "UPDATE meta SET valor = valor + 1 WHERE clave = 'version'"
+SQL_VERSION = "SELECT valor FROM meta WHERE clave = 'version'"
+SQL_ELIMINAR = "DELETE FROM docentes WHERE numero_empleado = ?"
+SQL_LISTAR = f"SELECT {COLUMNAS} FROM docentes ORDER BY id"
+SQL_PAGINA = f"SELECT {COLUMNAS} FROM docentes ORDER BY id LIMIT ? OFFSET ?"
+SQL_PAGINA_ORDENADA = f"SELECT {COLUMNAS} FROM docentes ORDER BY {{clave}} {{sentido}}, id LIMIT ? OFFSET ?"
+# Expresión de ordenamiento de cada columna de la vista, igual que `clave_orden`
+CLAVES_ORDEN = {
+    "numero_empleado": "numero_empleado",
+    "nombre": "normalizar(nombre)",
+    "especialidad": "normalizar(especialidad)",
+    "fecha_registro": "normalizar(coalesce(fecha_registro, ''))",
+}
+SQL_NUMEROS = "SELECT numero_empleado FROM docentes ORDER BY id"
+SQL_CONTAR = "SELECT count(*) FROM docentes"
+SQL_BUSCAR_NOMBRE_FTS = f"""SELECT {COLUMNAS} FROM docentes WHERE id IN (
+    SELECT rowid FROM docentes_fts WHERE docentes_fts MATCH ?) ORDER BY id"""
+SQL_BUSCAR_NOMBRE = f"SELECT {COLUMNAS} FROM docentes WHERE instr(normalizar(nombre), ?) > 0 ORDER BY id"
+SQL_ESPECIALIDADES = "SELECT DISTINCT especialidad FROM docentes"
+SQL_CONTEOS = """SELECT especialidad, count(*) FROM docentes
+    GROUP BY especialidad ORDER BY min(id)"""
+SQL_POR_DIA = """SELECT substr(fecha_registro, 1, 10) AS dia, count(*) FROM docentes
+    WHERE fecha_registro IS NOT NULL AND fecha_registro <> '' GROUP BY dia ORDER BY dia"""
+
+
+def a_fila(docente, version):
+    """Parámetros de SQL_INSERTAR y SQL_ACTUALIZAR para un docente"""
+    extra = {k: v for k, v in docente.items() if k not in CAMPOS}
+    return (version, docente['nombre'], docente['especialidad'], docente.get('fecha_registro'),
+            docente.get('fecha_actualizacion'),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+            docente['numero_empleado'])
+
+
+def de_fila(fila):
+    """Docente (diccionario) a partir de una fila de COLUMNAS"""
+    nombre, especialidad, numero, fecha_registro, fecha_actualizacion, extra = fila
+    docente = {"nombre": nombre, "especialidad": especialidad, "numero_empleado": numero}
+    if fecha_registro is not None:
+        docente["fecha_registro"] = fecha_registro
+    if fecha_actualizacion is not None:
+        docente["fecha_actualizacion"] = fecha_actualizacion
+    if extra:
+        docente.update(json.loads(extra))
+    return docente
+
+
+def conectar(ruta):
+    conexion = sqlite3.connect(ruta, cached_statements=SENTENCIAS_EN_CACHE, isolation_level=None)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=FULL")
+    conexion.create_function("normalizar", 1, normalizar, deterministic=True)
+    return conexion
+
+
+class ConsultaDocentes:
+    """Docentes de una transacción de lectura, recorribles varias veces"""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+        self._total = conexion.execute(SQL_CONTAR).fetchone()[0]
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        for fila in self.conexion.execute(SQL_LISTAR):
+            yield de_fila(fila)
+
+
+class EstadisticasSQLite:
+    """Estadísticas calculadas con consultas agregadas sobre los índices"""
+
+    def __init__(self, conexion):
+        self.conexion = conexion
+
+    @property
+    def total(self):
+        return self.conexion.execute(SQL_CONTAR).fetchone()[0]
+
+    def conteos(self):
+        return dict(self.conexion.execute(SQL_CONTEOS))
+
+    def porcentajes(self):
+        conteos = self.conteos()
+        total = sum(conteos.values())
+        if not total:
+            return {}
+        return {esp: (cantidad / total) * 100 for esp, cantidad in conteos.items()}
+
+    def top(self, n):
+        return sorted(self.conteos().items(), key=lambda par: par[1], reverse=True)[:n]
+
+    def registros_por_dia(self):
+        return dict(self.conexion.execute(SQL_POR_DIA))
+
+
+class AlmacenSQLite(AlmacenDocentes):
+    """Almacenamiento en SQLite (modo WAL) con índices y búsqueda FTS5
+
+    El número de empleado tiene un índice único, la especialidad un índice
+    normal y el nombre un índice FTS5 de trigramas para buscar subcadenas.
+    Los archivos JSON, XML y YAML se generan solo cuando se piden, desde una
+    conexión propia del hilo de exportación; la conexión principal solo se
+    usa desde el hilo que llamó a `cargar`.
+
+    Cada escritura incrementa un contador global guardado en la tabla `meta`
+    y lo asigna como versión a las filas que toca; SQLite serializa las
+    escrituras de todas las instancias que abren la misma base.
+    """
+
+    exporta_tras_cambios = False
+
+    def __init__(self, ruta=RUTA_SQLITE):
+        self.ruta = ruta
+        self.conexion = None
+        self.fts = False
+        # PRAGMA data_version de la última sincronización
+        self._version_datos = None
+
+    def cargar(self):
+        """Abre (o crea) la base; la primera vez importa docentes.json si existe"""
+        self.conexion = conectar(self.ruta)
+        columnas = [fila[1] for fila in self.conexion.execute("PRAGMA table_info(docentes)")]
+        if columnas and "version" not in columnas:
+            # Bases creadas antes de versionar los docentes
+            self.conexion.execute("ALTER TABLE docentes ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self.conexion.executescript(ESQUEMA)
+        try:
+            self.conexion.executescript(ESQUEMA_FTS)
+            self.fts = True
+        except sqlite3.OperationalError as e:
+            print(f"✗ FTS5 no disponible, la búsqueda por nombre recorrerá la tabla: {e}")
+        print(f"✓ Base de datos abierta: {self.ruta}")
+        if not len(self) and os.path.exists(RUTA_JSON):
+            with open(RUTA_JSON, 'r', encoding='utf-8') as archivo:
+                docentes = json.load(archivo)
+            self.agregar_lote({d['numero_empleado']: d for d in docentes}.values())
+            print(f"✓ {len(docentes)} docentes importados desde {RUTA_JSON}")
+        self._version_datos = self.conexion.execute("PRAGMA data_version").fetchone()[0]
+        return 0
+
+    def cerrar(self):
+        if self.conexion is not None:
+            self.conexion.close()
+            self.conexion = None
+
+    def __len__(self):
+        return self.conexion.execute(SQL_CONTAR).fetchone()[0]
+
+    def obtener(self, numero_empleado):
+        fila = self.conexion.execute(SQL_OBTENER, (numero_empleado,)).fetchone()
+        return de_fila(fila) if fila else None
+
+    def _escribir(self, operacion):
+        """Ejecuta `operacion(version)` en una transacción de escritura con la versión siguiente"""
+        self.conexion.execute("BEGIN IMMEDIATE")
+        try:
+            self.conexion.execute(SQL_SUBIR_VERSION)
+            resultado = operacion(self.conexion.execute(SQL_VERSION).fetchone()[0])
+        except BaseException:
+            self.conexion.execute("ROLLBACK")
+            raise
+        self.conexion.execute("COMMIT")
+        return resultado
+
+    def _verificar(self, versiones):
+        for numero, esperada in versiones.items():
+            if self.version_de(numero) != esperada:
+                raise ConflictoVersionError(
+                    f"El docente {numero} fue modificado en otra instancia; vuelva a consultarlo")
+
+    @property
+    def version_datos(self):
+        return self.conexion.execute(SQL_VERSION).fetchone()[0]
+
+    def version_de(self, numero_empleado):
+        fila = self.conexion.execute(SQL_VERSION_DOCENTE, (numero_empleado,)).fetchone()
+        return fila[0] if fila else None
+
+    def sincronizar(self):
+        """Detecta con PRAGMA data_version si otra conexión confirmó cambios
+
+        Las consultas siempre leen la base, así que no hay nada que aplicar.
+        """
+        version_datos = self.conexion.execute("PRAGMA data_version").fetchone()[0]
+        cambio = version_datos != self._version_datos
+        self._version_datos = version_datos
+        return int(cambio)
+
+    def agregar(self, docente):
+        try:
+            self._escribir(lambda version: self.conexion.execute(SQL_INSERTAR, a_fila(docente, version)))
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def agregar_lote(self, docentes):
+        docentes = list(docentes)
+        try:
+            self._escribir(lambda version: self.conexion.executemany(
+                SQL_INSERTAR, [a_fila(docente, version) for docente in docentes]))
+        except sqlite3.IntegrityError as e:
+            raise DocenteDuplicadoError(f"Número de empleado repetido: {e}")
+        return len(docentes)
+
+    def actualizar(self, numero_empleado, cambios, version=None):
+        def actualizar(nueva_version):
+            if version is not None:
+                self._verificar({numero_empleado: version})
+            anterior = self.obtener(numero_empleado)
+            if anterior is None:
+                return None
+            docente = {**anterior, **cambios}
+            self.conexion.execute(SQL_ACTUALIZAR, a_fila(docente, nueva_version))
+            return docente
+        return self._escribir(actualizar)
+
+    def eliminar(self, numero_empleado, version=None):
+        def eliminar(_):
+            if version is not None:
+                self._verificar({numero_empleado: version})
+            docente = self.obtener(numero_empleado)
+            if docente is not None:
+                self.conexion.execute(SQL_ELIMINAR, (numero_empleado,))
+            return docente
+        return self._escribir(eliminar)
+
+    def aplicar_cambios(self, cambios, versiones=None):
+        def aplicar(version):
+            if versiones:
+                self._verificar(versiones)
+            for numero, docente in cambios:
+                if docente is None:
+                    self.conexion.execute(SQL_ELIMINAR, (numero,))
+                elif not self.conexion.execute(SQL_ACTUALIZAR, a_fila(docente, version)).rowcount:
+                    self.conexion.execute(SQL_INSERTAR, a_fila(docente, version))
+        self._escribir(aplicar)
+
+    def listar(self):
+        return (de_fila(fila) for fila in self.conexion.execute(SQL_LISTAR))
+
+    def numeros(self):
+        return (fila[0] for fila in self.conexion.execute(SQL_NUMEROS))
+
+    def pagina(self, inicio, cantidad, orden=None):
+        if orden is None:
+            sql = SQL_PAGINA
+        else:
+            columna, descendente = orden
+            sql = SQL_PAGINA_ORDENADA.format(clave=CLAVES_ORDEN[columna],
+                                             sentido="DESC" if descendente else "ASC")
+        return [de_fila(fila) for fila in self.conexion.execute(sql, (cantidad, inicio))]
+
+    def buscar_por_nombre(self, texto):
+        consulta = normalizar(texto)
+        if self.fts and len(consulta) >= TAMANO_NGRAMA:
+            frase = '"' + consulta.replace('"', '""') + '"'
+            filas = self.conexion.execute(SQL_BUSCAR_NOMBRE_FTS, (frase,))
+        else:
+            filas = self.conexion.execute(SQL_BUSCAR_NOMBRE, (consulta,))
+        # El plegado de FTS5 no es idéntico a casefold; se confirma con la regla del repositorio
+        return [de_fila(f) for f in filas if consulta in normalizar(f[0])]
+
+    def buscar_por_especialidad(self, texto):
+        consulta = normalizar(texto)
+        especialidades = [fila[0] for fila in self.conexion.execute(SQL_ESPECIALIDADES)
+                          if consulta in normalizar(fila[0])]
+        if not especialidades:
+            return []
+        marcas = ", ".join("?" * len(especialidades))
+        filas = self.conexion.execute(
+            f"SELECT {COLUMNAS} FROM docentes WHERE especialidad IN ({marcas}) ORDER BY id",
+            especialidades)
+        return [de_fila(fila) for fila in filas]
+
+    @property
+    def estadisticas(self):
+        return EstadisticasSQLite(self.conexion)
+
+    def exportar(self, progreso=None):
+        """Genera los archivos desde una transacción de lectura propia
+
+        Las instancias exportan de a una para no mezclar archivos de
+        distintas versiones.
+        """
+        with BloqueoArchivo(RUTA_BLOQUEO_EXPORTACION):
+            conexion = conectar(self.ruta)
+            try:
+                conexion.execute("BEGIN")
+                docentes = ConsultaDocentes(conexion)
+                errores = generar_exportaciones(docentes, progreso)
+                conexion.execute("COMMIT")
+                return len(docentes), errores
+            finally:
+                conexion.close()
@@ -0,0 +1,244 @@
+"""Banco de pruebas de rendimiento (sin interfaz) para las operaciones de docentes
+
+Para cada tamaño de plantilla y cada almacenamiento genera docentes
+sintéticos en un directorio temporal y mide la carga inicial, las altas, la
+búsqueda avanzada (sin caché, con la consulta en caché y acotada por una
+consulta anterior), las actualizaciones, las bajas, la exportación completa
+y cada generador de archivos. Registra tiempos, pico de memoria (tracemalloc)
+y tamaño de los archivos, y guarda los resultados en JSON.
+
+Uso: python benchmark_docentes.py [--tamanos 1000 10000 ...] [--almacenes archivos sqlite]
+                                  [--operaciones 200] [--salida resultados_benchmark.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from almacen import crear_almacen
+from cache_busquedas import CacheBusquedas
+from nucleo_docentes import NucleoDocentes
+from persistencia import RUTA_DIARIO
+from instantanea_binaria import RUTA_BINARIA
+from exportador import (RUTA_JSON, RUTA_XML, RUTA_YAML, generar_archivo_json,
+                        generar_archivo_xml, generar_archivo_yaml_simple, generar_exportaciones)
+
+TAMANOS = (1_000, 10_000, 100_000, 1_000_000)
+ALMACENES = ("archivos", "sqlite")
+OPERACIONES = 200
+RUTA_RESULTADOS = "resultados_benchmark.json"
+
+NOMBRES = ("Ana", "Bruno", "Carla", "Diego", "Elena", "Fernando", "Gabriela", "Héctor",
+           "Isabel", "Jorge", "Karla", "Luis", "María", "Néstor", "Olga", "Pablo",
+           "Rocío", "Sergio", "Teresa", "Víctor")
+APELLIDOS = ("García", "Hernández", "López", "Martínez", "González", "Pérez", "Rodríguez",
+             "Sánchez", "Ramírez", "Cruz", "Flores", "Gómez", "Morales", "Vázquez",
+             "Jiménez", "Reyes", "Díaz", "Torres", "Gutiérrez", "Ruiz", "Mendoza", "Aguilar")
+ESPECIALIDADES = ("Matemáticas", "Física", "Química", "Biología", "Historia", "Geografía",
+                  "Literatura", "Inglés", "Informática", "Educación Física", "Artes",
+                  "Música", "Filosofía", "Economía", "Ciencias Sociales")
+DIAS_REGISTRO = 365
+
+
+def generar_docentes(cantidad, aleatorio, primer_numero=1):
+    """Docentes sintéticos con números consecutivos y fechas del último año"""
+    inicio = datetime(2024, 1, 1)
+    for numero in range(primer_numero, primer_numero + cantidad):
+        fecha = inicio + timedelta(days=aleatorio.randrange(DIAS_REGISTRO),
+                                   seconds=aleatorio.randrange(86400))
+        yield {
+            "nombre": f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)} "
+                      f"{aleatorio.choice(APELLIDOS)}",
+            "especialidad": aleatorio.choice(ESPECIALIDADES),
+            "numero_empleado": numero,
+            "fecha_registro": fecha.isoformat()
+        }
+
+
+def medir_tiempo(funcion, argumentos, preparar=None):
+    """Ejecuta `funcion` con cada argumento y devuelve los segundos de cada llamada
+
+    Si se da `preparar`, se llama con el mismo argumento antes de cada
+    llamada, fuera del tiempo medido.
+    """
+    tiempos = []
+    for argumento in argumentos:
+        if preparar is not None:
+            preparar(argumento)
+        inicio = time.perf_counter()
+        funcion(argumento)
+        tiempos.append(time.perf_counter() - inicio)
+    return tiempos
+
+
+def medir_memoria(funcion):
+    """Ejecuta `funcion` una vez con tracemalloc y devuelve el pico en bytes"""
+    tracemalloc.start()
+    try:
+        funcion()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def percentil(valores, fraccion):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))]
+
+
+def tamano_archivo(ruta):
+    return os.path.getsize(ruta) if os.path.exists(ruta) else None
+
+
+class Benchmark:
+    """Mediciones de un tamaño y un almacenamiento en el directorio actual"""
+
+    def __init__(self, tamano, almacen, operaciones, semilla):
+        self.tamano = tamano
+        self.almacen = almacen
+        self.operaciones = min(operaciones, tamano)
+        self.aleatorio = random.Random(semilla)
+        self.resultados = []
+
+    def registrar(self, operacion, tiempos, pico_memoria=None, archivo=None):
+        self.resultados.append({
+            "tamano": self.tamano,
+            "almacen": self.almacen,
+            "operacion": operacion,
+            "repeticiones": len(tiempos),
+            "segundos_total": sum(tiempos),
+            "segundos_media": sum(tiempos) / len(tiempos),
+            "segundos_p50": percentil(tiempos, 0.50),
+            "segundos_p95": percentil(tiempos, 0.95),
+            "pico_memoria_bytes": pico_memoria,
+            "tamano_archivo_bytes": tamano_archivo(archivo) if archivo else None,
+        })
+        print(f"  {operacion:<36} {sum(tiempos) / len(tiempos) * 1000:>12.3f} ms/op"
+              f"  ×{len(tiempos)}")
+
+    def crear_nucleo(self):
+        nucleo = NucleoDocentes(almacen=crear_almacen(self.almacen))
+        # Las exportaciones se miden llamando a exportar_datos directamente,
+        # así que el hilo de exportación no debe competir con las mediciones
+        nucleo.exportaciones.detener()
+        return nucleo
+
+    def ejecutar(self):
+        nucleo = self.crear_nucleo()
+        try:
+            nucleo.cargar_datos_desde_json()
+            docentes = list(generar_docentes(self.tamano, self.aleatorio))
+            self.registrar("agregar_lote", medir_tiempo(nucleo.agregar_lote, [docentes]))
+            self.medir_operaciones(nucleo, docentes)
+            self.medir_exportaciones(nucleo)
+        finally:
+            nucleo.cerrar()
+        self.medir_carga()
+        return self.resultados
+
+    def medir_operaciones(self, nucleo, docentes):
+        muestra = self.aleatorio.sample(docentes, self.operaciones)
+        nuevos = list(generar_docentes(self.operaciones, self.aleatorio, self.tamano + 1))
+        self.registrar("agregar", medir_tiempo(
+            lambda d: nucleo.agregar(d["nombre"], d["especialidad"], d["numero_empleado"]), nuevos))
+
+        numeros = [str(d["numero_empleado"]) for d in muestra]
+        apellidos = [d["nombre"].split()[1] for d in muestra]
+        especialidades = [d["especialidad"][:5] for d in muestra]
+        # Cada búsqueda se mide con la caché vacía; los resultados memorizados
+        # y los acotados por una consulta anterior se miden aparte
+        vaciar = lambda _=None: setattr(nucleo, "busquedas", CacheBusquedas())
+        for criterio, valores in (("numero", numeros), ("nombre", apellidos),
+                                  ("especialidad", especialidades)):
+            buscar = lambda valor: nucleo.buscar_avanzado(criterio, valor)
+            self.registrar(f"buscar_avanzado:{criterio}", medir_tiempo(buscar, valores, vaciar),
+                           medir_memoria(lambda: (vaciar(), buscar(valores[0]))))
+            if criterio == "numero":
+                continue
+            self.registrar(f"buscar_avanzado:{criterio}:cache", medir_tiempo(
+                buscar, valores, lambda valor: (vaciar(), buscar(valor))))
+            self.registrar(f"buscar_avanzado:{criterio}:acotada", medir_tiempo(
+                buscar, valores, lambda valor: (vaciar(), buscar(valor[:-1]))))
+
+        self.registrar("actualizar", medir_tiempo(
+            lambda d: nucleo.actualizar(d["numero_empleado"], nombre=d["nombre"] + " Jr."), muestra))
+        self.registrar("eliminar", medir_tiempo(
+            lambda d: nucleo.eliminar(d["numero_empleado"]), nuevos))
+
+    def medir_exportaciones(self, nucleo):
+        # guardar_datos solo programa la exportación; su trabajo es exportar_datos
+        exportar = lambda _: nucleo.exportar_datos()
+        self.registrar("exportar_datos", medir_tiempo(exportar, [None]),
+                       medir_memoria(nucleo.exportar_datos),
+                       RUTA_BINARIA if self.almacen == "archivos" else None)
+        for generar, ruta in ((generar_archivo_json, RUTA_JSON),
+                              (generar_archivo_xml, RUTA_XML),
+                              (generar_archivo_yaml_simple, RUTA_YAML)):
+            self.registrar(generar.__name__, medir_tiempo(generar, [nucleo.almacen]),
+                           medir_memoria(lambda: generar(nucleo.almacen)), ruta)
+        # Los tres formatos juntos, en paralelo desde UMBRAL_PARALELO docentes
+        self.registrar("generar_exportaciones", medir_tiempo(generar_exportaciones, [nucleo.almacen]))
+
+    def medir_carga(self):
+        """Tiempo y memoria de abrir los datos persistidos en un núcleo nuevo"""
+        def cargar(_=None):
+            nucleo = self.crear_nucleo()
+            try:
+                nucleo.cargar_datos_desde_json()
+            finally:
+                nucleo.cerrar()
+        archivo = RUTA_BINARIA if self.almacen == "archivos" else "docentes.db"
+        self.registrar("cargar_datos_desde_json", medir_tiempo(cargar, [None]),
+                       medir_memoria(cargar), archivo)
+        if os.path.exists(RUTA_DIARIO):
+            self.resultados[-1]["tamano_diario_bytes"] = tamano_archivo(RUTA_DIARIO)
+
+
+def ejecutar_benchmarks(tamanos, almacenes, operaciones, semilla):
+    """Ejecuta cada combinación en un directorio temporal propio"""
+    resultados = []
+    directorio_original = os.getcwd()
+    for tamano in tamanos:
+        for almacen in almacenes:
+            print(f"▶ {tamano} docentes, almacenamiento {almacen}")
+            with tempfile.TemporaryDirectory(prefix="benchmark_docentes_") as directorio:
+                os.chdir(directorio)
+                try:
+                    resultados.extend(Benchmark(tamano, almacen, operaciones, semilla).ejecutar())
+                finally:
+                    os.chdir(directorio_original)
+    return resultados
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de operaciones de docentes")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=TAMANOS)
+    parser.add_argument("--almacenes", nargs="+", choices=ALMACENES, default=ALMACENES)
+    parser.add_argument("--operaciones", type=int, default=OPERACIONES,
+                        help="repeticiones de cada operación individual")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", default=RUTA_RESULTADOS)
+    argumentos = parser.parse_args()
+
+    resultados = ejecutar_benchmarks(argumentos.tamanos, argumentos.almacenes,
+                                     argumentos.operaciones, argumentos.semilla)
+    informe = {
+        "fecha": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "semilla": argumentos.semilla,
+        "resultados": resultados,
+    }
+    with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(informe, archivo, ensure_ascii=False, indent=4)
+    print(f"✓ Resultados guardados en {argumentos.salida}")
+
+
+if __name__ == "__main__":
+    main()
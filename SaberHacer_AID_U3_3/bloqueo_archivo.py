@@ -0,0 +1,73 @@
+import os
+import threading
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+class BloqueoArchivo:
+    """Bloqueo exclusivo entre hilos y entre procesos sobre un archivo auxiliar
+
+    Dentro del proceso se comporta como un RLock; el primer nivel toma
+    además un bloqueo consultivo del sistema operativo (flock en POSIX,
+    msvcrt.locking en Windows) que las demás instancias de la aplicación
+    respetan. El archivo de bloqueo no guarda datos.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._hilos = threading.RLock()
+        self._niveles = 0
+        self._archivo = None
+
+    def __enter__(self):
+        self._hilos.acquire()
+        try:
+            if self._niveles == 0:
+                self._bloquear()
+        except BaseException:
+            self._hilos.release()
+            raise
+        self._niveles += 1
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self._niveles -= 1
+        try:
+            if self._niveles == 0:
+                self._liberar()
+        finally:
+            self._hilos.release()
+        return False
+
+    def _bloquear(self):
+        archivo = open(self.ruta, 'a+b')
+        try:
+            if os.name == "nt":
+                archivo.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK reintenta durante unos 10 segundos antes de fallar
+                        msvcrt.locking(archivo.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            else:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            archivo.close()
+            raise
+        self._archivo = archivo
+
+    def _liberar(self):
+        archivo, self._archivo = self._archivo, None
+        try:
+            if os.name == "nt":
+                archivo.seek(0)
+                msvcrt.locking(archivo.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(archivo.fileno(), fcntl.LOCK_UN)
+        finally:
+            archivo.close()
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+# Consultas recientes que se conservan
+CAPACIDAD_CACHE = 64
+
+
+class CacheBusquedas:
+    """Resultados recientes de la búsqueda avanzada (LRU) para una versión de los datos
+
+    Las claves son (criterio, consulta normalizada); cuando cambia la versión
+    de los datos se descarta todo, así que un resultado guardado nunca es de
+    datos anteriores. `base_para` ofrece resultados de una consulta contenida
+    en la nueva (al escribir una letra más), que contienen todas sus
+    coincidencias y bastan para filtrar sin recorrer la plantilla completa.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_CACHE):
+        self.capacidad = capacidad
+        self._resultados = OrderedDict()
+        self._version = None
+
+    def _validar(self, version):
+        if version != self._version:
+            self._resultados.clear()
+            self._version = version
+
+    def obtener(self, criterio, consulta, version):
+        """Resultados guardados de la consulta, o None"""
+        self._validar(version)
+        resultados = self._resultados.get((criterio, consulta))
+        if resultados is not None:
+            self._resultados.move_to_end((criterio, consulta))
+        return resultados
+
+    def base_para(self, criterio, consulta, version):
+        """Resultados de la consulta guardada más larga que es subcadena de `consulta`, o None"""
+        self._validar(version)
+        mejor = None
+        for (guardado, anterior), resultados in self._resultados.items():
+            if guardado == criterio and anterior in consulta and (
+                    mejor is None or len(anterior) > len(mejor[0])):
+                mejor = (anterior, resultados)
+        return mejor[1] if mejor is not None else None
+
+    def guardar(self, criterio, consulta, version, resultados):
+        self._validar(version)
+        self._resultados[(criterio, consulta)] = resultados
+        self._resultados.move_to_end((criterio, consulta))
+        while len(self._resultados) > self.capacidad:
+            self._resultados.popitem(last=False)
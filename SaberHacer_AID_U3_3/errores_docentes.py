@@ -0,0 +1,18 @@
+class ErrorDocentes(Exception):
+    """Error base de las operaciones sobre docentes"""
+
+
+class ValidacionError(ErrorDocentes):
+    """Los datos recibidos no cumplen las reglas de validación"""
+
+
+class DocenteNoEncontradoError(ErrorDocentes):
+    """No existe un docente con ese número de empleado"""
+
+
+class DocenteDuplicadoError(ErrorDocentes):
+    """Ya existe un docente con ese número de empleado"""
+
+
+class ConflictoVersionError(ErrorDocentes):
+    """El docente cambió (en otra instancia) desde que se consultó"""
@@ -0,0 +1,77 @@
+import heapq
+
+
+class AgregadorEstadisticas:
+    """Totales por especialidad y por día de registro mantenidos al vuelo
+
+    El repositorio llama a `registrar` y `retirar` en cada mutación, así que
+    consultar las estadísticas cuesta O(número de especialidades) en lugar de
+    recorrer todos los docentes.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._por_especialidad = {}
+        self._por_dia = {}
+
+    def registrar(self, docente):
+        self.total += 1
+        _sumar(self._por_especialidad, docente['especialidad'], 1)
+        dia = dia_registro(docente)
+        if dia:
+            _sumar(self._por_dia, dia, 1)
+
+    def retirar(self, docente):
+        self.total -= 1
+        _sumar(self._por_especialidad, docente['especialidad'], -1)
+        dia = dia_registro(docente)
+        if dia:
+            _sumar(self._por_dia, dia, -1)
+
+    def conteos(self):
+        """Docentes por especialidad, en orden de primera aparición"""
+        return dict(self._por_especialidad)
+
+    def porcentajes(self):
+        """Porcentaje de docentes de cada especialidad"""
+        if not self.total:
+            return {}
+        return {esp: (cantidad / self.total) * 100
+                for esp, cantidad in self._por_especialidad.items()}
+
+    def top(self, n):
+        """Las n especialidades con más docentes, de mayor a menor"""
+        return heapq.nlargest(n, self._por_especialidad.items(), key=lambda par: par[1])
+
+    def registros_por_dia(self):
+        """Docentes registrados por día (AAAA-MM-DD), ordenados por fecha"""
+        return dict(sorted(self._por_dia.items()))
+
+    def a_mapeo(self):
+        """Totales como estructura JSON (listas de pares para conservar el orden)"""
+        return {'total': self.total,
+                'por_especialidad': list(self._por_especialidad.items()),
+                'por_dia': list(self._por_dia.items())}
+
+    @classmethod
+    def desde_mapeo(cls, datos):
+        """Agregador con los totales guardados por `a_mapeo`"""
+        agregador = cls()
+        agregador.total = datos['total']
+        agregador._por_especialidad = dict(datos['por_especialidad'])
+        agregador._por_dia = dict(datos['por_dia'])
+        return agregador
+
+
+def dia_registro(docente):
+    """Día de registro (AAAA-MM-DD) tomado de la fecha ISO, o None si no es texto"""
+    fecha = docente.get('fecha_registro')
+    return fecha[:10] if isinstance(fecha, str) and fecha else None
+
+
+def _sumar(conteos, clave, cantidad):
+    total = conteos.get(clave, 0) + cantidad
+    if total:
+        conteos[clave] = total
+    else:
+        del conteos[clave]
@@ -0,0 +1,351 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from xml.sax.saxutils import escape
+
+from persistencia import escribir_atomico, archivo_atomico
+from metricas import METRICAS, cronometrar
+
+RUTA_JSON = "docentes.json"
+RUTA_XML = "docentes.xml"
+RUTA_YAML = "docentes.yaml"
+# Desde cuántos docentes se exporta en paralelo (con menos no compensa usar procesos)
+UMBRAL_PARALELO = 50_000
+# Docentes que serializa cada tarea del grupo de procesos
+TAMANO_FRAGMENTO = 10_000
+# Procesos del grupo de exportación (con uno solo se exporta en el mismo proceso)
+PROCESOS_EXPORTACION = min(4, os.cpu_count() or 1)
+
+
+def docente_json(docente):
+    """Un docente tal como json.dump(indent=4) lo escribe dentro de la lista"""
+    return json.dumps(docente, indent=4, ensure_ascii=False, default=dict).replace("\n", "\n    ")
+
+
+@cronometrar("exportar:json")
+def generar_archivo_json(docentes, ruta=RUTA_JSON):
+    """Escribe el JSON docente por docente con el mismo formato que json.dump(indent=4)"""
+    def escribir(archivo):
+        separador = "[\n    "
+        for docente in docentes:
+            archivo.write(separador + docente_json(docente))
+            separador = ",\n    "
+        archivo.write("[]" if separador == "[\n    " else "\n]")
+    escribir_atomico(ruta, escribir)
+
+
+def escapar_xml(texto):
+    """Escapa un texto igual que minidom al imprimir nodos de texto"""
+    return escape(texto, {'"': "&quot;"})
+
+
+def elemento_xml(etiqueta, texto, sangria):
+    if not texto:
+        return f"{sangria}<{etiqueta}/>\n"
+    return f"{sangria}<{etiqueta}>{escapar_xml(texto)}</{etiqueta}>\n"
+
+
+def docente_xml(docente):
+    return ("  <docente>\n"
+            + elemento_xml("nombre", docente["nombre"], "    ")
+            + elemento_xml("especialidad", docente["especialidad"], "    ")
+            + elemento_xml("numero_empleado", str(docente["numero_empleado"]), "    ")
+            + "  </docente>\n")
+
+
+@cronometrar("exportar:xml")
+def generar_archivo_xml(docentes, ruta=RUTA_XML):
+    """Escribe el XML docente por docente con el mismo formato que toprettyxml"""
+    def escribir(archivo):
+        archivo.write('<?xml version="1.0" ?>\n')
+        vacio = True
+        for docente in docentes:
+            if vacio:
+                archivo.write("<docentes>\n")
+                vacio = False
+            archivo.write(docente_xml(docente))
+        archivo.write("<docentes/>\n" if vacio else "</docentes>\n")
+    escribir_atomico(ruta, escribir)
+
+
+def docente_yaml(docente):
+    return ("  - nombre: " + docente['nombre'] + "\n"
+            + "    especialidad: " + docente['especialidad'] + "\n"
+            + "    numero_empleado: " + str(docente['numero_empleado']) + "\n")
+
+
+@cronometrar("exportar:yaml")
+def generar_archivo_yaml_simple(docentes, ruta=RUTA_YAML):
+    """Escribe el YAML con una sola escritura por docente"""
+    def escribir(archivo):
+        archivo.write("docentes:\n")
+        for docente in docentes:
+            archivo.write(docente_yaml(docente))
+    escribir_atomico(ruta, escribir)
+
+
+# Fragmentos: texto de varios docentes seguidos, sin la apertura ni el cierre del archivo.
+# Se ejecutan en los procesos del grupo.
+
+def fragmento_json(docentes):
+    return ",\n    ".join(map(docente_json, docentes))
+
+
+def fragmento_xml(docentes):
+    return "".join(map(docente_xml, docentes))
+
+
+def fragmento_yaml(docentes):
+    return "".join(map(docente_yaml, docentes))
+
+
+# Cómo se arma cada archivo: los fragmentos van entre `apertura` y `cierre`
+# separados por `separador`; sin docentes se escribe `vacio`
+Formato = namedtuple("Formato", "ruta generar fragmento apertura separador cierre vacio")
+FORMATOS = {
+    "JSON": Formato(RUTA_JSON, generar_archivo_json, fragmento_json,
+                    "[\n    ", ",\n    ", "\n]", "[]"),
+    "XML": Formato(RUTA_XML, generar_archivo_xml, fragmento_xml,
+                   '<?xml version="1.0" ?>\n<docentes>\n', "", "</docentes>\n",
+                   '<?xml version="1.0" ?>\n<docentes/>\n'),
+    "YAML": Formato(RUTA_YAML, generar_archivo_yaml_simple, fragmento_yaml,
+                    "docentes:\n", "", "", "docentes:\n"),
+}
+
+_grupo = None
+_bloqueo_grupo = threading.Lock()
+
+
+def grupo_procesos():
+    """Grupo de procesos de exportación, creado la primera vez que se necesita"""
+    global _grupo
+    with _bloqueo_grupo:
+        if _grupo is None:
+            # spawn: el proceso tiene hilos (interfaz, exportador) y fork no es seguro con ellos
+            _grupo = ProcessPoolExecutor(PROCESOS_EXPORTACION,
+                                         mp_context=multiprocessing.get_context("spawn"))
+        return _grupo
+
+
+def detener_procesos():
+    """Termina el grupo de procesos de exportación, si se creó"""
+    global _grupo
+    with _bloqueo_grupo:
+        grupo, _grupo = _grupo, None
+    if grupo is not None:
+        grupo.shutdown(cancel_futures=True)
+
+
+def generar_exportaciones(docentes, progreso=None):
+    """Genera JSON, XML y YAML; devuelve los errores por formato
+
+    `docentes` debe poder recorrerse varias veces (una por formato). Con
+    UMBRAL_PARALELO docentes o más, los tres formatos se serializan a la vez
+    y por fragmentos en el grupo de procesos (ver ExportacionParalela).
+    `progreso`, si se indica, recibe (formato, hechos, total, segundos) cada
+    vez que un formato avanza.
+    """
+    if PROCESOS_EXPORTACION > 1 and len(docentes) >= UMBRAL_PARALELO:
+        try:
+            return ExportacionParalela(grupo_procesos(), docentes, progreso).ejecutar()
+        except (BrokenProcessPool, OSError) as e:
+            print(f"✗ Exportación en paralelo no disponible, se exporta en serie: {e}")
+            detener_procesos()
+    errores = {}
+    for formato, datos in FORMATOS.items():
+        inicio = time.perf_counter()
+        try:
+            datos.generar(docentes)
+        except Exception as e:
+            errores[formato] = e
+        if progreso is not None:
+            progreso(formato, 1, 1, time.perf_counter() - inicio)
+    return errores
+
+
+def fragmentos(docentes, tamano=TAMANO_FRAGMENTO):
+    """Listas de hasta `tamano` docentes como diccionarios, que se pueden enviar a otro proceso"""
+    fragmento = []
+    for docente in docentes:
+        fragmento.append(dict(docente))
+        if len(fragmento) == tamano:
+            yield fragmento
+            fragmento = []
+    if fragmento:
+        yield fragmento
+
+
+class SalidaFragmentada:
+    """Archivo de un formato que se escribe fragmento a fragmento (atómicamente)"""
+
+    def __init__(self, formato):
+        self.formato = formato
+        self.escritos = 0
+        self._contexto = archivo_atomico(formato.ruta)
+        self._archivo = self._contexto.__enter__()
+
+    def escribir(self, texto):
+        self._archivo.write((self.formato.separador if self.escritos else self.formato.apertura) + texto)
+        self.escritos += 1
+
+    def cerrar(self):
+        """Completa el archivo y lo deja en su ruta"""
+        try:
+            self._archivo.write(self.formato.cierre if self.escritos else self.formato.vacio)
+        except BaseException as e:
+            self.descartar(e)
+            raise
+        self._contexto.__exit__(None, None, None)
+
+    def descartar(self, error):
+        """Borra el temporal; el archivo anterior queda intacto"""
+        self._contexto.__exit__(type(error), error, error.__traceback__)
+
+
+class ExportacionParalela:
+    """Serializa los tres formatos por fragmentos en un grupo de procesos
+
+    Cada fragmento de docentes se envía una vez por formato, así que los
+    tres formatos avanzan a la vez y cada uno usa varios procesos. El hilo
+    que exporta escribe los resultados en el orden original, con a lo sumo
+    dos fragmentos por proceso en curso para acotar la memoria. Un error
+    en un formato no detiene a los demás.
+    """
+
+    def __init__(self, grupo, docentes, progreso=None):
+        self.grupo = grupo
+        self.docentes = docentes
+        self.progreso = progreso
+        self.total = -(-len(docentes) // TAMANO_FRAGMENTO)
+        self.errores = {}
+        self.salidas = {}
+
+    def ejecutar(self):
+        self.inicio = time.perf_counter()
+        for formato, datos in FORMATOS.items():
+            try:
+                self.salidas[formato] = SalidaFragmentada(datos)
+            except OSError as e:
+                self.errores[formato] = e
+        pendientes = deque()
+        try:
+            for fragmento in fragmentos(self.docentes):
+                pendientes.append({formato: self.grupo.submit(salida.formato.fragmento, fragmento)
+                                   for formato, salida in self.salidas.items()})
+                if len(pendientes) >= 2 * PROCESOS_EXPORTACION:
+                    self._escribir(pendientes.popleft())
+            while pendientes:
+                self._escribir(pendientes.popleft())
+        except BaseException as e:
+            for futuros in pendientes:
+                for futuro in futuros.values():
+                    futuro.cancel()
+            for salida in self.salidas.values():
+                salida.descartar(e)
+            raise
+        for formato, salida in self.salidas.items():
+            try:
+                salida.cerrar()
+            except Exception as e:
+                self.errores[formato] = e
+                continue
+            segundos = time.perf_counter() - self.inicio
+            if METRICAS.activas:
+                METRICAS.registrar_latencia(f"exportar:{formato.lower()}", int(segundos * 1e9))
+        return self.errores
+
+    def _escribir(self, futuros):
+        """Escribe un fragmento de cada formato, esperando a que esté serializado"""
+        for formato, futuro in futuros.items():
+            salida = self.salidas.get(formato)
+            if salida is None:
+                continue
+            try:
+                salida.escribir(futuro.result())
+            except BrokenProcessPool:
+                raise
+            except Exception as e:
+                salida.descartar(e)
+                del self.salidas[formato]
+                self.errores[formato] = e
+                continue
+            if self.progreso is not None:
+                self.progreso(formato, salida.escritos, self.total, time.perf_counter() - self.inicio)
+
+
+class ProgramadorExportaciones:
+    """Ejecuta exportaciones en un hilo de trabajo agrupando ráfagas de cambios
+
+    Cada llamada a `solicitar` marca los datos como pendientes; el hilo espera
+    a que pasen `espera` segundos sin nuevas solicitudes (o como máximo
+    `espera_maxima`) y ejecuta `tarea` una sola vez. El valor devuelto por la
+    tarea, o la excepción que lanzó, se deja en la cola `resultados` para que
+    el hilo de la interfaz lo recoja.
+    """
+
+    def __init__(self, tarea, espera=1.0, espera_maxima=5.0):
+        self.tarea = tarea
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.resultados = queue.Queue()
+        self._condicion = threading.Condition()
+        self._pendiente = False
+        self._primera_solicitud = None
+        self._ultima_solicitud = None
+        self._inmediato = False
+        self._detenido = False
+        self._hilo = threading.Thread(target=self._trabajar, name="exportador", daemon=True)
+        self._hilo.start()
+
+    def solicitar(self, inmediato=False):
+        """Marca los datos como modificados; `inmediato` omite la espera"""
+        with self._condicion:
+            ahora = time.monotonic()
+            if not self._pendiente:
+                self._primera_solicitud = ahora
+            self._pendiente = True
+            self._ultima_solicitud = ahora
+            self._inmediato = self._inmediato or inmediato
+            self._condicion.notify()
+
+    def detener(self):
+        """Ejecuta la exportación pendiente, si la hay, y termina el hilo"""
+        with self._condicion:
+            self._detenido = True
+            self._condicion.notify()
+        self._hilo.join()
+
+    def _esperar_turno(self):
+        """Bloquea hasta que toque exportar; devuelve False si hay que terminar"""
+        with self._condicion:
+            while True:
+                if self._pendiente:
+                    if self._inmediato or self._detenido:
+                        break
+                    ahora = time.monotonic()
+                    limite = min(self._ultima_solicitud + self.espera,
+                                 self._primera_solicitud + self.espera_maxima)
+                    if ahora >= limite:
+                        break
+                    self._condicion.wait(limite - ahora)
+                elif self._detenido:
+                    return False
+                else:
+                    self._condicion.wait()
+            self._pendiente = False
+            self._inmediato = False
+            return True
+
+    def _trabajar(self):
+        while self._esperar_turno():
+            try:
+                resultado = self.tarea()
+            except Exception as e:
+                resultado = e
+            self.resultados.put(resultado)
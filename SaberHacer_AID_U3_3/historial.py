@@ -0,0 +1,69 @@
+from collections import deque
+
+from errores_docentes import ConflictoVersionError
+
+# Operaciones confirmadas que se pueden deshacer
+PROFUNDIDAD_HISTORIAL = 100
+
+
+class HistorialCambios:
+    """Pilas de deshacer y rehacer de las operaciones confirmadas
+
+    Cada entrada es la lista de (numero_empleado, antes, después) de una
+    operación o transacción, con None donde el docente no existía; solo
+    guarda los docentes afectados, nunca una copia de la lista completa.
+    """
+
+    def __init__(self, profundidad=PROFUNDIDAD_HISTORIAL):
+        self._deshacer = deque(maxlen=profundidad)
+        self._rehacer = []
+
+    @property
+    def puede_deshacer(self):
+        return bool(self._deshacer)
+
+    @property
+    def puede_rehacer(self):
+        return bool(self._rehacer)
+
+    def registrar(self, cambios):
+        """Agrega una operación confirmada; descarta lo que se podía rehacer"""
+        if cambios:
+            self._deshacer.append(cambios)
+            self._rehacer.clear()
+
+    def deshacer(self, aplicar):
+        """Llama a `aplicar` con los pares (numero, estado anterior) de la última operación
+
+        El segundo argumento de `aplicar` asocia cada número con el estado que
+        dejó la operación, para comprobar que nadie lo cambió después. La
+        operación solo pasa a la pila de rehacer si `aplicar` no falla; si
+        falla con ConflictoVersionError ya no podrá deshacerse, así que se
+        descarta para no bloquear las anteriores y el error se propaga.
+        Devuelve cuántos docentes se restauraron (0 si no había nada).
+        """
+        if not self._deshacer:
+            return 0
+        cambios = self._deshacer[-1]
+        try:
+            aplicar([(numero, antes) for numero, antes, _ in reversed(cambios)],
+                    {numero: despues for numero, _, despues in cambios})
+        except ConflictoVersionError:
+            self._deshacer.pop()
+            raise
+        self._rehacer.append(self._deshacer.pop())
+        return len(cambios)
+
+    def rehacer(self, aplicar):
+        """Inverso de `deshacer`: vuelve a aplicar la última operación deshecha"""
+        if not self._rehacer:
+            return 0
+        cambios = self._rehacer[-1]
+        try:
+            aplicar([(numero, despues) for numero, _, despues in cambios],
+                    {numero: antes for numero, antes, _ in cambios})
+        except ConflictoVersionError:
+            self._rehacer.pop()
+            raise
+        self._deshacer.append(self._rehacer.pop())
+        return len(cambios)
@@ -0,0 +1,239 @@
+"""Importación masiva de docentes desde JSON, XML, YAML o CSV
+
+Uso: python importador.py archivo [--formato json|xml|yaml|csv]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+
+from nucleo_docentes import NucleoDocentes, ValidacionError, validar_docente
+
+FORMATOS = ("json", "xml", "yaml", "csv")
+# Fechas opcionales que se conservan del archivo
+CAMPOS_FECHA = ("fecha_registro", "fecha_actualizacion")
+# Bytes leídos por bloque al recorrer un arreglo JSON
+TAMANO_BLOQUE_JSON = 64 * 1024
+
+
+class InformeImportacion:
+    """Resultado de una importación masiva"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.aceptados = 0
+        self.rechazados = []
+        self.segundos = 0.0
+
+    @property
+    def leidos(self):
+        return self.aceptados + len(self.rechazados)
+
+    @property
+    def registros_por_segundo(self):
+        return self.leidos / self.segundos if self.segundos else 0.0
+
+    def rechazar(self, ubicacion, motivo):
+        self.rechazados.append((ubicacion, motivo))
+
+    def resumen(self, maximo_rechazos=20):
+        lineas = [
+            f"📥 IMPORTACIÓN DE {os.path.basename(self.ruta)}:",
+            f"✅ Importados: {self.aceptados}",
+            f"❌ Rechazados: {len(self.rechazados)}",
+            f"⏱️ {self.segundos:.2f} s ({self.registros_por_segundo:.0f} registros/s)",
+        ]
+        for ubicacion, motivo in self.rechazados[:maximo_rechazos]:
+            lineas.append(f"   • {ubicacion}: {motivo}")
+        if len(self.rechazados) > maximo_rechazos:
+            lineas.append(f"   … y {len(self.rechazados) - maximo_rechazos} más")
+        return "\n".join(lineas)
+
+
+# --- Lectores: cada uno produce (ubicación, registro) sin cargar el archivo entero ---
+
+def leer_json(ruta):
+    """Recorre un arreglo JSON de objetos decodificando un elemento a la vez"""
+    decodificador = json.JSONDecoder()
+    with open(ruta, 'r', encoding='utf-8-sig') as archivo:
+        bufer = ""
+        posicion = 0
+        fin = False
+
+        def rellenar():
+            nonlocal bufer, posicion, fin
+            bloque = archivo.read(TAMANO_BLOQUE_JSON)
+            fin = not bloque
+            bufer = bufer[posicion:] + bloque
+            posicion = 0
+
+        def saltar_espacios():
+            nonlocal posicion
+            while True:
+                while posicion < len(bufer) and bufer[posicion].isspace():
+                    posicion += 1
+                if posicion < len(bufer) or fin:
+                    return
+                rellenar()
+
+        saltar_espacios()
+        if bufer[posicion:posicion + 1] != "[":
+            raise ValueError("El archivo JSON debe contener un arreglo de docentes")
+        posicion += 1
+        indice = 0
+        while True:
+            saltar_espacios()
+            if bufer[posicion:posicion + 1] == "]":
+                return
+            if indice:
+                if bufer[posicion:posicion + 1] != ",":
+                    raise ValueError(f"JSON inválido después del elemento {indice}")
+                posicion += 1
+                saltar_espacios()
+            while True:
+                try:
+                    registro, posicion = decodificador.raw_decode(bufer, posicion)
+                    break
+                except ValueError:
+                    if fin:
+                        raise ValueError(f"JSON inválido en el elemento {indice + 1}")
+                    rellenar()
+            indice += 1
+            yield f"elemento {indice}", registro
+
+
+def leer_xml(ruta):
+    """Recorre los elementos <docente> liberando cada uno tras leerlo"""
+    eventos = ET.iterparse(ruta, events=("start", "end"))
+    _, raiz = next(eventos)
+    indice = 0
+    for evento, elemento in eventos:
+        if evento != "end" or elemento.tag != "docente":
+            continue
+        indice += 1
+        yield f"docente {indice}", {hijo.tag: (hijo.text or "").strip() for hijo in elemento}
+        raiz.clear()
+
+
+def leer_yaml(ruta):
+    """Lee el YAML simple que genera la aplicación (lista de mapas planos)"""
+    registro = None
+    inicio = 0
+    with open(ruta, 'r', encoding='utf-8-sig') as archivo:
+        for numero_linea, linea in enumerate(archivo, start=1):
+            contenido = linea.strip()
+            if not contenido or contenido.startswith("#") or contenido == "docentes:":
+                continue
+            if contenido.startswith("- "):
+                if registro is not None:
+                    yield f"línea {inicio}", registro
+                registro = {}
+                inicio = numero_linea
+                contenido = contenido[2:].strip()
+            if registro is None:
+                raise ValueError(f"YAML inválido en la línea {numero_linea}")
+            clave, separador, valor = contenido.partition(":")
+            if not separador:
+                raise ValueError(f"YAML inválido en la línea {numero_linea}")
+            registro[clave.strip()] = valor.strip()
+    if registro is not None:
+        yield f"línea {inicio}", registro
+
+
+def leer_csv(ruta):
+    """Lee un CSV con encabezados nombre, especialidad, numero_empleado"""
+    with open(ruta, 'r', encoding='utf-8-sig', newline='') as archivo:
+        for numero_linea, registro in enumerate(csv.DictReader(archivo), start=2):
+            yield f"línea {numero_linea}", registro
+
+
+LECTORES = {"json": leer_json, "xml": leer_xml, "yaml": leer_yaml, "csv": leer_csv}
+
+
+def validar_fechas(registro):
+    """Fechas presentes en el registro; lanza ValidacionError si alguna no es texto"""
+    fechas = {}
+    for campo in CAMPOS_FECHA:
+        valor = registro.get(campo)
+        if valor is None or valor == "":
+            continue
+        if not isinstance(valor, str):
+            raise ValidacionError(f"El campo {campo} debe ser una fecha en texto")
+        fechas[campo] = valor
+    return fechas
+
+
+def detectar_formato(ruta):
+    extension = os.path.splitext(ruta)[1].lower().lstrip(".")
+    if extension == "yml":
+        extension = "yaml"
+    if extension not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {extension or ruta}")
+    return extension
+
+
+def importar(nucleo, ruta, formato=None):
+    """Importa un archivo completo como una sola transacción y devuelve el informe
+
+    Cada registro se valida con las mismas reglas que el formulario; los que
+    fallan, o cuyo número ya existe en el sistema o se repite en el archivo,
+    se rechazan sin detener la importación.
+    """
+    formato = formato or detectar_formato(ruta)
+    informe = InformeImportacion(ruta)
+    inicio = time.perf_counter()
+    ahora = datetime.now().isoformat()
+    nuevos = []
+    vistos = set()
+    for ubicacion, registro in LECTORES[formato](ruta):
+        if not isinstance(registro, dict):
+            informe.rechazar(ubicacion, "El registro no es un objeto")
+            continue
+        try:
+            nombre, especialidad, numero = validar_docente(
+                registro.get("nombre"), registro.get("especialidad"), registro.get("numero_empleado"))
+            fechas = validar_fechas(registro)
+        except ValidacionError as e:
+            informe.rechazar(ubicacion, str(e))
+            continue
+        if numero in vistos or nucleo.almacen.existe(numero):
+            informe.rechazar(ubicacion, f"Ya existe un docente con el número {numero}")
+            continue
+        vistos.add(numero)
+        docente = {
+            "nombre": nombre,
+            "especialidad": especialidad,
+            "numero_empleado": numero,
+            "fecha_registro": fechas.get("fecha_registro", ahora)
+        }
+        if "fecha_actualizacion" in fechas:
+            docente["fecha_actualizacion"] = fechas["fecha_actualizacion"]
+        nuevos.append(docente)
+    informe.aceptados = nucleo.agregar_lote(nuevos)
+    informe.segundos = time.perf_counter() - inicio
+    return informe
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Importación masiva de docentes")
+    parser.add_argument("archivo")
+    parser.add_argument("--formato", choices=FORMATOS)
+    argumentos = parser.parse_args()
+
+    nucleo = NucleoDocentes()
+    try:
+        nucleo.cargar_datos_desde_json()
+        informe = importar(nucleo, argumentos.archivo, argumentos.formato)
+        print(informe.resumen())
+    except Exception as e:
+        print(f"✗ Error al importar: {e}")
+    finally:
+        nucleo.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import json
+import mmap
+import os
+import struct
+
+from estadisticas import AgregadorEstadisticas
+from persistencia import escribir_atomico
+from metricas import cronometrar
+
+RUTA_BINARIA = "docentes.bin"
+
+# Cabecera: firma, formato, cantidad de registros, posición del índice,
+# versión de los datos (la del diario al tomar la instantánea) y posición
+# de los totales para estadísticas
+FIRMA = b"DOCB"
+VERSION = 3
+CABECERA = struct.Struct("<4sH2xQQQQ")
+# Formatos anteriores: sin totales (2) y además sin la versión de los datos (1)
+CABECERA_V2 = struct.Struct("<4sH2xQQQ")
+CABECERA_V1 = struct.Struct("<4sH2xQQ")
+FIRMA_Y_FORMATO = struct.Struct("<4sH")
+# Cada registro: número de empleado, longitud y el docente en JSON compacto
+REGISTRO = struct.Struct("<qI")
+# Tras los registros, los totales en JSON; al final del archivo el índice
+# (número, posición) ordenado por número
+ENTRADA_INDICE = struct.Struct("<qQ")
+
+
+@cronometrar("exportar:bin")
+def escribir_instantanea_binaria(docentes, ruta=RUTA_BINARIA, version=0):
+    """Escribe la instantánea binaria con sus totales y su índice por número de empleado"""
+    def escribir(archivo):
+        archivo.write(bytes(CABECERA.size))
+        posicion = CABECERA.size
+        indice = []
+        estadisticas = AgregadorEstadisticas()
+        for docente in docentes:
+            datos = json.dumps(docente, ensure_ascii=False, separators=(',', ':'), default=dict).encode('utf-8')
+            numero = docente['numero_empleado']
+            archivo.write(REGISTRO.pack(numero, len(datos)) + datos)
+            indice.append((numero, posicion))
+            posicion += REGISTRO.size + len(datos)
+            estadisticas.registrar(docente)
+        totales = json.dumps(estadisticas.a_mapeo(), ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        archivo.write(totales)
+        indice.sort()
+        archivo.write(b"".join(ENTRADA_INDICE.pack(*entrada) for entrada in indice))
+        archivo.seek(0)
+        archivo.write(CABECERA.pack(FIRMA, VERSION, len(indice), posicion + len(totales), version, posicion))
+    escribir_atomico(ruta, escribir, binario=True)
+
+
+def leer_cabecera(datos, ruta):
+    """Estructura de la cabecera según el formato, o ValueError si no es válida"""
+    if len(datos) < FIRMA_Y_FORMATO.size:
+        raise ValueError(f"Instantánea binaria truncada: {ruta}")
+    firma, formato = FIRMA_Y_FORMATO.unpack_from(datos, 0)
+    cabecera = {1: CABECERA_V1, 2: CABECERA_V2, VERSION: CABECERA}.get(formato)
+    if firma != FIRMA or cabecera is None:
+        raise ValueError(f"Instantánea binaria no reconocida: {ruta}")
+    if len(datos) < cabecera.size:
+        raise ValueError(f"Instantánea binaria truncada: {ruta}")
+    return cabecera
+
+
+def version_instantanea(ruta=RUTA_BINARIA):
+    """Versión de los datos de la instantánea en disco, leyendo solo la cabecera
+
+    Devuelve None si no existe o no es válida.
+    """
+    try:
+        with open(ruta, 'rb') as archivo:
+            datos = archivo.read(CABECERA.size)
+        cabecera = leer_cabecera(datos, ruta)
+    except (OSError, ValueError):
+        return None
+    campos = cabecera.unpack_from(datos, 0)
+    return campos[4] if len(campos) > 4 else 0
+
+
+class InstantaneaBinaria:
+    """Instantánea de solo lectura abierta sin decodificar los registros
+
+    Abrirla solo lee la cabecera; cada docente se decodifica cuando se pide,
+    buscando su posición en el índice ordenado.
+    """
+
+    def __init__(self, ruta=RUTA_BINARIA):
+        with open(ruta, 'rb') as archivo:
+            if os.name == "nt":
+                # En Windows un archivo mapeado no puede reemplazarse con
+                # os.replace, así que se lee completo en lugar de mapearlo
+                self._datos = archivo.read()
+            else:
+                self._datos = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        cabecera = leer_cabecera(self._datos, ruta)
+        _, _, self._cantidad, self._inicio_indice, *resto = cabecera.unpack_from(self._datos, 0)
+        # Versión de los datos: la última operación del diario incluida
+        self.version = resto[0] if resto else 0
+        self._inicio_registros = cabecera.size
+        # Los registros terminan donde empiezan los totales (o el índice si no hay)
+        self._fin_registros = resto[1] if len(resto) > 1 else self._inicio_indice
+        if self._inicio_indice + self._cantidad * ENTRADA_INDICE.size != len(self._datos):
+            raise ValueError(f"Instantánea binaria truncada: {ruta}")
+        if not self._inicio_registros <= self._fin_registros <= self._inicio_indice:
+            raise ValueError(f"Instantánea binaria no reconocida: {ruta}")
+
+    def __len__(self):
+        return self._cantidad
+
+    def _posicion(self, numero_empleado):
+        """Posición del registro en el archivo, o None (búsqueda binaria)"""
+        bajo, alto = 0, self._cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            numero, posicion = ENTRADA_INDICE.unpack_from(
+                self._datos, self._inicio_indice + medio * ENTRADA_INDICE.size)
+            if numero < numero_empleado:
+                bajo = medio + 1
+            elif numero > numero_empleado:
+                alto = medio
+            else:
+                return posicion
+        return None
+
+    def _leer(self, posicion):
+        _, longitud = REGISTRO.unpack_from(self._datos, posicion)
+        inicio = posicion + REGISTRO.size
+        return json.loads(self._datos[inicio:inicio + longitud].decode('utf-8'))
+
+    def contiene(self, numero_empleado):
+        return self._posicion(numero_empleado) is not None
+
+    def obtener(self, numero_empleado):
+        """Decodifica el docente con ese número, o devuelve None"""
+        posicion = self._posicion(numero_empleado)
+        return None if posicion is None else self._leer(posicion)
+
+    def estadisticas(self):
+        """Totales guardados al escribir la instantánea, o None si el formato no los tiene"""
+        if self._fin_registros == self._inicio_indice:
+            return None
+        datos = self._datos[self._fin_registros:self._inicio_indice]
+        return AgregadorEstadisticas.desde_mapeo(json.loads(datos.decode('utf-8')))
+
+    def numeros(self):
+        """Itera los números en el orden del archivo sin decodificar registros"""
+        posicion = self._inicio_registros
+        while posicion < self._fin_registros:
+            numero, longitud = REGISTRO.unpack_from(self._datos, posicion)
+            yield numero
+            posicion += REGISTRO.size + longitud
+
+    def __iter__(self):
+        """Decodifica los docentes en el orden del archivo"""
+        posicion = self._inicio_registros
+        while posicion < self._fin_registros:
+            _, longitud = REGISTRO.unpack_from(self._datos, posicion)
+            inicio = posicion + REGISTRO.size
+            yield json.loads(self._datos[inicio:inicio + longitud].decode('utf-8'))
+            posicion = inicio + longitud
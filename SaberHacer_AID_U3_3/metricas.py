@@ -0,0 +1,146 @@
+"""Métricas de rendimiento: latencias por operación, registros y bytes escritos
+
+Las operaciones se instrumentan con el decorador `cronometrar`; mientras las
+métricas estén desactivadas solo cuesta comprobar un atributo por llamada.
+Se activan con DOCENTES_METRICAS=1 (o `METRICAS.activar()`) y, si además se
+define DOCENTES_METRICAS_ARCHIVO, se vuelcan periódicamente a ese JSON.
+"""
+import functools
+import json
+import math
+import os
+import threading
+import time
+
+VARIABLE_METRICAS = "DOCENTES_METRICAS"
+VARIABLE_ARCHIVO = "DOCENTES_METRICAS_ARCHIVO"
+# Segundos entre volcados del archivo de métricas
+INTERVALO_VOLCADO = 60.0
+# Cubetas del histograma por cada potencia de 2 (error relativo < 9 %)
+SUBDIVISIONES = 8
+PERCENTILES = (50, 95, 99)
+
+
+class HistogramaLatencias:
+    """Histograma logarítmico de latencias en nanosegundos
+
+    Usa memoria acotada sin importar cuántas muestras reciba; los percentiles
+    se aproximan con el límite superior de la cubeta que los contiene.
+    """
+
+    def __init__(self):
+        self.cubetas = {}
+        self.cuenta = 0
+        self.total = 0
+        self.maximo = 0
+
+    def registrar(self, nanosegundos):
+        indice = int(math.log2(nanosegundos) * SUBDIVISIONES) if nanosegundos > 1 else 0
+        self.cubetas[indice] = self.cubetas.get(indice, 0) + 1
+        self.cuenta += 1
+        self.total += nanosegundos
+        self.maximo = max(self.maximo, nanosegundos)
+
+    def percentil(self, porcentaje):
+        """Latencia (ns) por debajo de la cual queda `porcentaje` de las muestras"""
+        objetivo = self.cuenta * porcentaje / 100
+        acumulado = 0
+        for indice in sorted(self.cubetas):
+            acumulado += self.cubetas[indice]
+            if acumulado >= objetivo:
+                return min(2 ** ((indice + 1) / SUBDIVISIONES), self.maximo)
+        return self.maximo
+
+    def resumen(self):
+        """Diccionario con cuenta, media, percentiles y máximo en milisegundos"""
+        datos = {"cuenta": self.cuenta,
+                 "media_ms": self.total / self.cuenta / 1e6 if self.cuenta else 0.0}
+        for porcentaje in PERCENTILES:
+            datos[f"p{porcentaje}_ms"] = self.percentil(porcentaje) / 1e6 if self.cuenta else 0.0
+        datos["max_ms"] = self.maximo / 1e6
+        return datos
+
+
+class Metricas:
+    """Registro de latencias y contadores compartido por toda la aplicación"""
+
+    def __init__(self, activas=False):
+        self.activas = activas
+        self._bloqueo = threading.Lock()
+        self._histogramas = {}
+        self._contadores = {}
+        self._volcado = None
+        self._detener_volcado = threading.Event()
+
+    def activar(self, activas=True):
+        self.activas = activas
+
+    def registrar_latencia(self, operacion, nanosegundos):
+        with self._bloqueo:
+            histograma = self._histogramas.get(operacion)
+            if histograma is None:
+                histograma = self._histogramas[operacion] = HistogramaLatencias()
+            histograma.registrar(nanosegundos)
+
+    def sumar(self, contador, cantidad=1):
+        """Suma al contador (registros, bytes escritos...) si las métricas están activas"""
+        if not self.activas:
+            return
+        with self._bloqueo:
+            self._contadores[contador] = self._contadores.get(contador, 0) + cantidad
+
+    def instantanea(self):
+        """Copia de las métricas actuales lista para serializar en JSON"""
+        with self._bloqueo:
+            return {
+                "operaciones": {nombre: histograma.resumen()
+                                for nombre, histograma in sorted(self._histogramas.items())},
+                "contadores": dict(sorted(self._contadores.items())),
+            }
+
+    def iniciar_volcado(self, ruta, intervalo=INTERVALO_VOLCADO):
+        """Escribe las métricas en `ruta` cada `intervalo` segundos (hilo aparte)"""
+        self.detener_volcado()
+        self._detener_volcado.clear()
+
+        def volcar_periodicamente():
+            while not self._detener_volcado.wait(intervalo):
+                self.volcar(ruta)
+            self.volcar(ruta)
+
+        self._volcado = threading.Thread(target=volcar_periodicamente, name="metricas", daemon=True)
+        self._volcado.start()
+
+    def detener_volcado(self):
+        """Hace un último volcado y termina el hilo, si estaba en marcha"""
+        if self._volcado is not None:
+            self._detener_volcado.set()
+            self._volcado.join()
+            self._volcado = None
+
+    def volcar(self, ruta):
+        from persistencia import escribir_atomico
+        datos = {"fecha": time.strftime("%Y-%m-%dT%H:%M:%S"), **self.instantanea()}
+        try:
+            escribir_atomico(ruta, lambda archivo: json.dump(datos, archivo, ensure_ascii=False, indent=4))
+        except OSError as e:
+            print(f"✗ Error al volcar métricas: {e}")
+
+
+METRICAS = Metricas(activas=os.environ.get(VARIABLE_METRICAS, "") not in ("", "0"))
+
+
+def cronometrar(operacion):
+    """Decorador que registra la latencia de cada llamada en METRICAS"""
+    def decorar(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            if not METRICAS.activas:
+                return funcion(*args, **kwargs)
+            inicio = time.perf_counter_ns()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                METRICAS.registrar_latencia(operacion, time.perf_counter_ns() - inicio)
+        return envoltura
+    return decorar
@@ -0,0 +1,412 @@
+import os
+import threading
+from datetime import datetime
+
+from almacen import crear_almacen
+from errores_docentes import (ErrorDocentes, ValidacionError, DocenteNoEncontradoError,
+                              DocenteDuplicadoError, ConflictoVersionError)
+from exportador import ProgramadorExportaciones, detener_procesos
+from historial import HistorialCambios
+from cache_busquedas import CacheBusquedas
+from repositorio_docentes import normalizar
+from metricas import METRICAS, VARIABLE_ARCHIVO, cronometrar
+
+__all__ = ["ErrorDocentes", "ValidacionError", "DocenteNoEncontradoError",
+           "DocenteDuplicadoError", "ConflictoVersionError", "CRITERIOS_BUSQUEDA", "validar_numero",
+           "validar_docente", "NucleoDocentes", "Transaccion"]
+
+# Criterios aceptados por la búsqueda avanzada
+CRITERIOS_BUSQUEDA = ("numero", "nombre", "especialidad")
+# Rango de un entero con signo de 64 bits (SQLite y la instantánea binaria)
+NUMERO_MINIMO = -2 ** 63
+NUMERO_MAXIMO = 2 ** 63 - 1
+
+
+def validar_numero(numero_empleado):
+    """Convierte el número de empleado a entero o lanza ValidacionError"""
+    if numero_empleado is None or not str(numero_empleado).strip():
+        raise ValidacionError("El número de empleado es obligatorio")
+    if isinstance(numero_empleado, bool) or (
+            isinstance(numero_empleado, float) and not numero_empleado.is_integer()):
+        raise ValidacionError("El número de empleado debe ser un número válido")
+    try:
+        numero = int(numero_empleado)
+    except (TypeError, ValueError):
+        raise ValidacionError("El número de empleado debe ser un número válido")
+    if not NUMERO_MINIMO <= numero <= NUMERO_MAXIMO:
+        raise ValidacionError("El número de empleado está fuera de rango")
+    return numero
+
+
+def validar_docente(nombre, especialidad, numero_empleado):
+    """Valida los campos obligatorios y devuelve (nombre, especialidad, numero)"""
+    if not isinstance(nombre, str) or not nombre.strip():
+        raise ValidacionError("El nombre es obligatorio")
+    if not isinstance(especialidad, str) or not especialidad.strip():
+        raise ValidacionError("La especialidad es obligatoria")
+    return nombre.strip(), especialidad.strip(), validar_numero(numero_empleado)
+
+
+def nuevo_docente(nombre, especialidad, numero_empleado):
+    """Valida los campos y arma el docente con su fecha de registro"""
+    nombre, especialidad, numero_empleado = validar_docente(nombre, especialidad, numero_empleado)
+    return {
+        "nombre": nombre,
+        "especialidad": especialidad,
+        "numero_empleado": numero_empleado,
+        "fecha_registro": datetime.now().isoformat()
+    }
+
+
+def cambios_actualizacion(nombre=None, especialidad=None):
+    """Campos no vacíos a cambiar más la fecha de actualización"""
+    if nombre is not None and not isinstance(nombre, str):
+        raise ValidacionError("El nombre debe ser texto")
+    if especialidad is not None and not isinstance(especialidad, str):
+        raise ValidacionError("La especialidad debe ser texto")
+    cambios = {}
+    if nombre and nombre.strip():
+        cambios['nombre'] = nombre.strip()
+    if especialidad and especialidad.strip():
+        cambios['especialidad'] = especialidad.strip()
+    cambios['fecha_actualizacion'] = datetime.now().isoformat()
+    return cambios
+
+
+class Transaccion:
+    """Cambios sobre varios docentes que se confirman o descartan juntos
+
+    Las operaciones se validan al pedirlas pero solo se acumulan (las
+    lecturas de la transacción ya las ven); `confirmar` las aplica con una
+    sola escritura y las deja en el historial como una única operación a
+    deshacer. Como gestor de contexto confirma al salir sin errores y
+    revierte si hubo una excepción.
+
+    Si otra instancia cambia alguno de los docentes tocados antes de
+    confirmar, `confirmar` lanza ConflictoVersionError y no aplica nada.
+    """
+
+    def __init__(self, nucleo):
+        self._nucleo = nucleo
+        # Estado final, estado previo y versión leída de cada docente tocado (None: no existe)
+        self._cambios = {}
+        self._anteriores = {}
+        self._versiones = {}
+        self.activa = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        if self.activa:
+            if tipo is None:
+                self.confirmar()
+            else:
+                self.revertir()
+        return False
+
+    def _actual(self, numero_empleado):
+        if numero_empleado in self._cambios:
+            return self._cambios[numero_empleado]
+        return self._nucleo.almacen.obtener(numero_empleado)
+
+    def _poner(self, numero_empleado, docente):
+        if not self.activa:
+            raise ErrorDocentes("La transacción ya terminó")
+        if numero_empleado not in self._anteriores:
+            self._anteriores[numero_empleado] = self._nucleo.almacen.obtener(numero_empleado)
+            self._versiones[numero_empleado] = self._nucleo.almacen.version_de(numero_empleado)
+        self._cambios[numero_empleado] = docente
+
+    def obtener(self, numero_empleado):
+        """Devuelve el docente tal como queda en la transacción"""
+        docente = self._actual(validar_numero(numero_empleado))
+        if docente is None:
+            raise DocenteNoEncontradoError("No se encontró un docente con ese número de empleado")
+        return docente
+
+    def agregar(self, nombre, especialidad, numero_empleado):
+        docente = nuevo_docente(nombre, especialidad, numero_empleado)
+        if self._actual(docente['numero_empleado']) is not None:
+            raise DocenteDuplicadoError("Ya existe un docente con ese número de empleado")
+        self._poner(docente['numero_empleado'], docente)
+        return docente
+
+    def actualizar(self, numero_empleado, nombre=None, especialidad=None):
+        anterior = self.obtener(numero_empleado)
+        docente = {**anterior, **cambios_actualizacion(nombre, especialidad)}
+        self._poner(docente['numero_empleado'], docente)
+        return docente
+
+    def eliminar(self, numero_empleado):
+        docente = self.obtener(numero_empleado)
+        self._poner(docente['numero_empleado'], None)
+        return docente
+
+    def confirmar(self):
+        """Aplica los cambios acumulados y devuelve cuántos docentes cambiaron"""
+        if not self.activa:
+            raise ErrorDocentes("La transacción ya terminó")
+        self.activa = False
+        cambios = [(numero, self._anteriores[numero], docente)
+                   for numero, docente in self._cambios.items()
+                   if self._anteriores[numero] is not None or docente is not None]
+        return self._nucleo.aplicar_cambios(cambios, self._versiones)
+
+    def revertir(self):
+        """Descarta los cambios acumulados"""
+        self.activa = False
+        self._cambios.clear()
+        self._anteriores.clear()
+        self._versiones.clear()
+
+
+class NucleoDocentes:
+    """Lógica de docentes independiente de la interfaz
+
+    Valida los datos, delega la persistencia en un almacenamiento
+    (ver `almacen.crear_almacen`) y programa las exportaciones en segundo
+    plano. La usan tanto la ventana Tk como el servidor HTTP; los errores se
+    comunican con excepciones de ErrorDocentes.
+
+    Varias instancias pueden compartir los datos: `actualizar` y `eliminar`
+    aceptan la versión leída con `version_de` y fallan con
+    ConflictoVersionError si el docente cambió desde entonces, y
+    `sincronizar` incorpora lo que hicieron las demás.
+    """
+
+    def __init__(self, espera_exportacion=1.0, almacen=None, progreso=None):
+        self.almacen = crear_almacen() if almacen is None else almacen
+        # Recibe el avance de cada formato desde el hilo de exportación
+        self.progreso_exportacion = progreso
+        self.exportaciones = ProgramadorExportaciones(self.exportar_datos, espera=espera_exportacion)
+        self.historial = HistorialCambios()
+        self.busquedas = CacheBusquedas()
+        # Hilo que construye los índices de búsqueda fuera del hilo que llama
+        self._preparacion = None
+        ruta_metricas = os.environ.get(VARIABLE_ARCHIVO)
+        if ruta_metricas:
+            METRICAS.activar()
+            METRICAS.iniciar_volcado(ruta_metricas)
+
+    @cronometrar("cargar")
+    def cargar_datos_desde_json(self):
+        """Abre los datos persistidos; exporta de nuevo si se recuperaron operaciones"""
+        aplicadas = self.almacen.cargar()
+        if aplicadas:
+            self.exportaciones.solicitar()
+        return aplicadas
+
+    @property
+    def indices_listos(self):
+        """Indica si una búsqueda puede hacerse sin construir antes los índices"""
+        return self.almacen.indices_listos
+
+    def preparar_indices(self):
+        """Construye en segundo plano los índices de búsqueda, si faltan y no se están construyendo"""
+        if self.almacen.indices_listos or (self._preparacion is not None and self._preparacion.is_alive()):
+            return
+        self._preparacion = threading.Thread(target=self.almacen.preparar_indices, name="indices", daemon=True)
+        self._preparacion.start()
+
+    def guardar_datos(self):
+        """Programa la exportación tras una mutación, si el almacenamiento la pide"""
+        if self.almacen.exporta_tras_cambios:
+            self.exportaciones.solicitar()
+
+    @cronometrar("exportar_datos")
+    def exportar_datos(self):
+        """Genera los archivos exportados (hilo de exportación)"""
+        total, errores = self.almacen.exportar(self.progreso_exportacion)
+        METRICAS.sumar("docentes_exportados", total)
+        return total, errores
+
+    def sincronizar(self):
+        """Incorpora los cambios de otras instancias; devuelve cuántos hubo (0 si ninguno)"""
+        return self.almacen.sincronizar()
+
+    def version_de(self, numero_empleado):
+        """Versión actual del docente, para pasarla a `actualizar` o `eliminar`"""
+        version = self.almacen.version_de(validar_numero(numero_empleado))
+        if version is None:
+            raise DocenteNoEncontradoError("No se encontró un docente con ese número de empleado")
+        return version
+
+    def cerrar(self):
+        """Termina la exportación pendiente y libera el almacenamiento"""
+        self.exportaciones.detener()
+        detener_procesos()
+        self.almacen.cerrar()
+        METRICAS.detener_volcado()
+
+    @cronometrar("obtener")
+    def obtener(self, numero_empleado):
+        """Devuelve el docente o lanza DocenteNoEncontradoError"""
+        docente = self.almacen.obtener(validar_numero(numero_empleado))
+        if docente is None:
+            raise DocenteNoEncontradoError("No se encontró un docente con ese número de empleado")
+        return docente
+
+    @cronometrar("agregar")
+    def agregar(self, nombre, especialidad, numero_empleado):
+        """Registra un docente nuevo y lo devuelve"""
+        docente = nuevo_docente(nombre, especialidad, numero_empleado)
+        if not self.almacen.agregar(docente):
+            raise DocenteDuplicadoError("Ya existe un docente con ese número de empleado")
+        self.historial.registrar([(docente['numero_empleado'], None, docente)])
+        self.guardar_datos()
+        return docente
+
+    @cronometrar("agregar_lote")
+    def agregar_lote(self, docentes):
+        """Agrega varios docentes nuevos en una sola transacción
+
+        Se insertan todos o ninguno (DocenteDuplicadoError) y se programa una
+        única exportación.
+        """
+        docentes = list(docentes)
+        agregados = self.almacen.agregar_lote(docentes)
+        METRICAS.sumar("docentes_agregados_en_lote", agregados)
+        if agregados:
+            self.historial.registrar([(d['numero_empleado'], None, d) for d in docentes])
+            self.guardar_datos()
+        return agregados
+
+    @cronometrar("actualizar")
+    def actualizar(self, numero_empleado, nombre=None, especialidad=None, version=None):
+        """Actualiza los campos no vacíos del docente y lo devuelve
+
+        Con `version`, lanza ConflictoVersionError si el docente ya no está en
+        esa versión.
+        """
+        # El estado anterior va al historial: se lee con los cambios ajenos aplicados
+        self.almacen.sincronizar()
+        anterior = self.obtener(numero_empleado)
+        numero_empleado = anterior['numero_empleado']
+        docente = self.almacen.actualizar(numero_empleado, cambios_actualizacion(nombre, especialidad),
+                                          version)
+        if docente is None:
+            raise DocenteNoEncontradoError("No se encontró un docente con ese número de empleado")
+        self.historial.registrar([(numero_empleado, anterior, docente)])
+        self.guardar_datos()
+        return docente
+
+    @cronometrar("eliminar")
+    def eliminar(self, numero_empleado, version=None):
+        """Elimina el docente y lo devuelve (con `version`, como en `actualizar`)"""
+        docente = self.almacen.eliminar(validar_numero(numero_empleado), version)
+        if docente is None:
+            raise DocenteNoEncontradoError("No se encontró un docente con ese número de empleado")
+        self.historial.registrar([(docente['numero_empleado'], docente, None)])
+        self.guardar_datos()
+        return docente
+
+    def transaccion(self):
+        """Inicia una transacción: `with nucleo.transaccion() as t: t.actualizar(...)`
+
+        Antes incorpora los cambios de otras instancias, así que los
+        docentes que lea la transacción están al día y al confirmar solo hay
+        conflicto si alguien los cambia mientras tanto.
+        """
+        self.almacen.sincronizar()
+        return Transaccion(self)
+
+    @cronometrar("aplicar_cambios")
+    def aplicar_cambios(self, cambios, versiones=None):
+        """Aplica (numero, antes, después) de una transacción y los deja en el historial"""
+        if not cambios:
+            return 0
+        self.almacen.aplicar_cambios([(numero, despues) for numero, _, despues in cambios], versiones)
+        self.historial.registrar(cambios)
+        self.guardar_datos()
+        return len(cambios)
+
+    def _restaurar(self, cambios, esperados):
+        """Aplica `cambios` si los docentes siguen como los dejó la operación"""
+        self.almacen.sincronizar()
+        versiones = {}
+        for numero, esperado in esperados.items():
+            actual = self.almacen.obtener(numero)
+            if actual != esperado:
+                raise ConflictoVersionError(
+                    f"El docente {numero} fue modificado en otra instancia; no se puede deshacer")
+            versiones[numero] = self.almacen.version_de(numero)
+        self.almacen.aplicar_cambios(cambios, versiones)
+        self.guardar_datos()
+
+    def deshacer(self):
+        """Deshace la última operación; devuelve cuántos docentes restauró (0 si no había)"""
+        return self.historial.deshacer(self._restaurar)
+
+    def rehacer(self):
+        """Vuelve a aplicar la última operación deshecha; devuelve cuántos docentes cambió"""
+        return self.historial.rehacer(self._restaurar)
+
+    def renombrar_especialidad(self, actual, nueva):
+        """Cambia la especialidad de todos sus docentes en una sola transacción
+
+        `actual` se compara sin distinguir mayúsculas. Devuelve cuántos
+        docentes cambiaron.
+        """
+        if not isinstance(actual, str) or not actual.strip():
+            raise ValidacionError("Ingrese la especialidad a renombrar")
+        if not isinstance(nueva, str) or not nueva.strip():
+            raise ValidacionError("La especialidad es obligatoria")
+        buscada = normalizar(actual.strip())
+        renombrados = 0
+        with self.transaccion() as transaccion:
+            for docente in self.almacen.buscar_por_especialidad(actual.strip()):
+                if normalizar(docente['especialidad']) == buscada:
+                    transaccion.actualizar(docente['numero_empleado'], especialidad=nueva)
+                    renombrados += 1
+        return renombrados
+
+    @cronometrar("buscar_avanzado")
+    def buscar_avanzado(self, criterio, valor):
+        """Docentes que cumplen el criterio ('numero', 'nombre' o 'especialidad')
+
+        Las búsquedas por nombre y especialidad se memorizan hasta el próximo
+        cambio de los datos; una consulta que extiende otra ya memorizada
+        filtra esos resultados en vez de recorrer toda la plantilla.
+        """
+        if not isinstance(valor, str) or not valor.strip():
+            raise ValidacionError("Ingrese un valor para buscar")
+        valor = valor.strip()
+        if criterio == "numero":
+            docente = self.almacen.obtener(validar_numero(valor))
+            return [docente] if docente else []
+        if criterio not in ("nombre", "especialidad"):
+            raise ValidacionError(f"Criterio de búsqueda no válido: {criterio}")
+        consulta = normalizar(valor)
+        version = self.almacen.version_datos
+        resultados = self.busquedas.obtener(criterio, consulta, version)
+        if resultados is not None:
+            METRICAS.sumar("busquedas_en_cache")
+            return list(resultados)
+        base = self.busquedas.base_para(criterio, consulta, version)
+        if base is not None:
+            # Las coincidencias de la consulta extendida están entre las de la anterior
+            METRICAS.sumar("busquedas_acotadas")
+            resultados = [d for d in base if consulta in normalizar(d[criterio])]
+        elif criterio == "nombre":
+            resultados = self.almacen.buscar_por_nombre(valor)
+        else:
+            resultados = self.almacen.buscar_por_especialidad(valor)
+        self.busquedas.guardar(criterio, consulta, version, resultados)
+        return list(resultados)
+
+    @cronometrar("estadisticas")
+    def resumen_estadisticas(self, top=5):
+        """Totales, distribución por especialidad, top y registros por día"""
+        estadisticas = self.almacen.estadisticas
+        porcentajes = estadisticas.porcentajes()
+        return {
+            "total": estadisticas.total,
+            "por_especialidad": {
+                esp: {"cantidad": cantidad, "porcentaje": porcentajes[esp]}
+                for esp, cantidad in estadisticas.conteos().items()
+            },
+            "top": [{"especialidad": esp, "cantidad": cantidad}
+                    for esp, cantidad in estadisticas.top(top)],
+            "registros_por_dia": estadisticas.registros_por_dia(),
+        }
@@ -0,0 +1,230 @@
+import json
+import os
+from contextlib import contextmanager
+
+from metricas import METRICAS, cronometrar
+
+RUTA_DIARIO = "docentes.journal"
+# Búfer de escritura de los archivos completos (instantánea y exportaciones)
+TAMANO_BUFER = 1024 * 1024
+
+
+def escribir_atomico(ruta, escribir, binario=False):
+    """Escribe un archivo mediante un temporal que se renombra al terminar
+
+    `escribir` recibe el archivo temporal abierto en modo texto (o binario
+    si `binario` es verdadero). Si algo falla, el archivo original queda
+    intacto.
+    """
+    with archivo_atomico(ruta, binario) as archivo:
+        escribir(archivo)
+
+
+@contextmanager
+def archivo_atomico(ruta, binario=False):
+    """Versión de `escribir_atomico` como gestor de contexto (`with ... as archivo`)"""
+    temporal = ruta + ".tmp"
+    if binario:
+        abrir = lambda: open(temporal, 'wb', buffering=TAMANO_BUFER)
+    else:
+        abrir = lambda: open(temporal, 'w', encoding='utf-8', buffering=TAMANO_BUFER)
+    try:
+        with abrir() as archivo:
+            yield archivo
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            if METRICAS.activas:
+                METRICAS.sumar(f"bytes_escritos:{os.path.basename(ruta)}",
+                               os.fstat(archivo.fileno()).st_size)
+        os.replace(temporal, ruta)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+class DiarioDocentes:
+    """Diario de solo anexado con las mutaciones posteriores a la última instantánea
+
+    Cada línea es un objeto JSON con la versión (`v`), la operación y el
+    estado completo del docente afectado, de modo que reproducir el diario
+    sobre una instantánea que ya contiene algunas de esas operaciones deja
+    el mismo resultado, y cada lector puede saltar las versiones que ya
+    aplicó.
+
+    Al compactar, el diario se rota a `<ruta>.old` mientras se escribe la
+    instantánea; el segmento rotado solo se borra cuando la instantánea quedó
+    en disco, y mientras exista se lee antes que el diario actual.
+
+    El archivo se abre en cada anexado para que, si otra instancia lo rota,
+    la siguiente escritura vaya al diario nuevo. Leer y anexar deben hacerse
+    con el bloqueo de los datos tomado.
+    """
+
+    def __init__(self, ruta=RUTA_DIARIO):
+        self.ruta = ruta
+        self.ruta_rotada = ruta + ".old"
+        # (inodo, bytes) del diario actual ya leídos, para leer solo lo nuevo
+        self._leido = None
+
+    def registrar(self, operacion, docente, version=None):
+        """Anexa una operación ('guardar' o 'eliminar') y la lleva a disco"""
+        self._anexar(entrada_diario(operacion, docente), version)
+
+    def registrar_lote(self, docentes, version=None):
+        """Anexa varios docentes nuevos como una sola línea
+
+        Al ser una única línea, una escritura interrumpida descarta el lote
+        completo al reproducir el diario: se aplica todo o nada.
+        """
+        self._anexar({"op": "lote", "docentes": docentes}, version)
+
+    def registrar_transaccion(self, cambios, version=None):
+        """Anexa los cambios de una transacción como una sola línea (todo o nada)
+
+        `cambios` son pares (numero_empleado, docente); None como docente
+        significa que se eliminó.
+        """
+        self._anexar({"op": "transaccion", "cambios": [
+            entrada_diario("eliminar", {"numero_empleado": numero}) if docente is None
+            else entrada_diario("guardar", docente)
+            for numero, docente in cambios]}, version)
+
+    @cronometrar("diario:anexar")
+    def _anexar(self, entrada, version):
+        if version is not None:
+            entrada = {"v": version, **entrada}
+        linea = json.dumps(entrada, ensure_ascii=False, separators=(',', ':'), default=dict) + "\n"
+        datos = linea.encode('utf-8')
+        with open(self.ruta, 'ab') as archivo:
+            estado = os.fstat(archivo.fileno())
+            al_dia = (self._leido == (estado.st_ino, estado.st_size)
+                      or (self._leido is None and not estado.st_size))
+            archivo.write(datos)
+            METRICAS.sumar("bytes_escritos:diario", len(datos))
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        if al_dia:
+            # Lo propio no hace falta volver a leerlo
+            self._leido = (estado.st_ino, estado.st_size + len(datos))
+
+    def leer(self, desde_version=0, completo=False):
+        """Entradas (versión, entrada) posteriores a `desde_version`, en orden
+
+        El segmento rotado se lee completo; del diario actual solo se lee lo
+        anexado desde la lectura anterior, salvo con `completo`. Las entradas
+        sin versión (diarios antiguos) se numeran a continuación de la
+        anterior.
+        """
+        entradas = []
+        ultima = self._leer_segmento(self.ruta_rotada, 0, 0, desde_version, entradas)
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            self._leido = None
+            return entradas
+        leidas = None
+        if (not completo and self._leido is not None
+                and self._leido[0] == estado.st_ino and self._leido[1] <= estado.st_size):
+            leidas = self._leer_segmento(self.ruta, self._leido[1], max(ultima, desde_version),
+                                         desde_version, entradas, continuo=True)
+        if leidas is None:
+            self._leer_segmento(self.ruta, 0, ultima, desde_version, entradas)
+        self._leido = (estado.st_ino, os.path.getsize(self.ruta))
+        return entradas
+
+    def _leer_segmento(self, ruta, inicio, ultima, desde_version, entradas, continuo=False):
+        """Lee un segmento desde `inicio` y devuelve la última versión vista
+
+        Una última línea incompleta (escritura interrumpida) se descarta y se
+        recorta del archivo para que los siguientes anexados queden legibles.
+        Con `continuo`, la primera línea debe ser la versión siguiente a
+        `ultima`; si no lo es (otra instancia rotó el diario y el archivo
+        nuevo reutilizó el inodo) devuelve None sin leer nada.
+        """
+        if not os.path.exists(ruta):
+            return ultima
+        valido = inicio
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(inicio)
+            for linea in archivo:
+                if not linea.endswith(b"\n"):
+                    if continuo:
+                        return None
+                    break
+                try:
+                    entrada = json.loads(linea)
+                except ValueError:
+                    if continuo:
+                        return None
+                    break
+                if continuo and entrada.get("v", ultima + 1) != ultima + 1:
+                    return None
+                continuo = False
+                ultima = entrada.get("v", ultima + 1)
+                if ultima > desde_version:
+                    entradas.append((ultima, entrada))
+                valido += len(linea)
+        if valido != os.path.getsize(ruta):
+            print("✗ Diario con una escritura incompleta; se descarta el final")
+            with open(ruta, 'r+b') as archivo:
+                archivo.truncate(valido)
+        return ultima
+
+    def rotar(self):
+        """Aparta las operaciones actuales para la instantánea que se va a escribir
+
+        Si quedó un segmento rotado de una compactación fallida, las
+        operaciones actuales se le anexan para no perder el orden.
+        """
+        if os.path.exists(self.ruta):
+            if os.path.exists(self.ruta_rotada):
+                with open(self.ruta, 'rb') as origen, open(self.ruta_rotada, 'ab') as destino:
+                    destino.write(origen.read())
+                    destino.flush()
+                    os.fsync(destino.fileno())
+                os.remove(self.ruta)
+            else:
+                os.replace(self.ruta, self.ruta_rotada)
+        self._leido = None
+
+    def descartar_rotado(self):
+        """Borra el segmento rotado una vez que la instantánea está en disco"""
+        if os.path.exists(self.ruta_rotada):
+            os.remove(self.ruta_rotada)
+
+
+def entrada_diario(operacion, docente):
+    if operacion == "eliminar":
+        return {"op": operacion, "numero_empleado": docente['numero_empleado']}
+    return {"op": operacion, "docente": docente}
+
+
+def numeros_entrada(entrada):
+    """Números de empleado afectados por una entrada del diario"""
+    if entrada["op"] == "eliminar":
+        return [entrada["numero_empleado"]]
+    if entrada["op"] == "lote":
+        return [docente['numero_empleado'] for docente in entrada["docentes"]]
+    if entrada["op"] == "transaccion":
+        return [numero for cambio in entrada["cambios"] for numero in numeros_entrada(cambio)]
+    return [entrada["docente"]['numero_empleado']]
+
+
+def aplicar_entrada(repositorio, entrada):
+    """Aplica una entrada del diario sobre el repositorio"""
+    if entrada["op"] == "eliminar":
+        repositorio.eliminar(entrada["numero_empleado"])
+    elif entrada["op"] == "lote":
+        for docente in entrada["docentes"]:
+            guardar_docente(repositorio, docente)
+    elif entrada["op"] == "transaccion":
+        for cambio in entrada["cambios"]:
+            aplicar_entrada(repositorio, cambio)
+    else:
+        guardar_docente(repositorio, entrada["docente"])
+
+
+def guardar_docente(repositorio, docente):
+    """Inserta o reemplaza el estado de un docente"""
+    repositorio.reemplazar(docente)
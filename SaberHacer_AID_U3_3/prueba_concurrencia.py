@@ -0,0 +1,178 @@
+"""Comprobación (sin interfaz) de dos instancias que comparten el directorio de datos
+
+Reproduce secuencias de operaciones de dos núcleos sobre el mismo
+almacenamiento en un directorio temporal y verifica que ambos, y una
+instancia nueva, terminan con los mismos docentes.
+
+Uso: python prueba_concurrencia.py [--almacenes archivos sqlite]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+
+from almacen import crear_almacen
+from nucleo_docentes import NucleoDocentes, ConflictoVersionError
+
+ALMACENES = ("archivos", "sqlite")
+# Docentes que agrega cada instancia antes de una exportación concurrente
+TAMANO_LOTE = 20000
+
+
+def abrir(almacen):
+    nucleo = NucleoDocentes(almacen=crear_almacen(almacen))
+    # Las exportaciones se piden explícitamente para fijar el orden de los pasos
+    nucleo.exportaciones.detener()
+    nucleo.cargar_datos_desde_json()
+    return nucleo
+
+
+def numeros(nucleo):
+    return sorted(nucleo.almacen.numeros())
+
+
+def comprobar_compactacion_ajena(almacen):
+    """B se sincroniza después de que A compactó operaciones que B no había leído"""
+    a, b = abrir(almacen), abrir(almacen)
+    try:
+        a.agregar("Ana", "Física", 1)
+        a.agregar("Bruno", "Química", 2)
+        b.sincronizar()
+        a.agregar("Carla", "Historia", 3)
+        a.exportar_datos()
+        a.agregar("Diego", "Artes", 4)
+        b.sincronizar()
+        assert numeros(b) == [1, 2, 3, 4], f"B quedó con {numeros(b)}"
+        b.exportar_datos()
+    finally:
+        a.cerrar()
+        b.cerrar()
+    nueva = abrir(almacen)
+    try:
+        assert numeros(nueva) == [1, 2, 3, 4], f"Una instancia nueva ve {numeros(nueva)}"
+    finally:
+        nueva.cerrar()
+
+
+def comprobar_conflicto(almacen):
+    """Una actualización con la versión leída falla si la otra instancia cambió el docente"""
+    a, b = abrir(almacen), abrir(almacen)
+    try:
+        a.agregar("Ana", "Física", 1)
+        b.sincronizar()
+        version = b.version_de(1)
+        a.actualizar(1, nombre="Ana María")
+        try:
+            b.actualizar(1, nombre="Ana Sofía", version=version)
+        except ConflictoVersionError:
+            pass
+        else:
+            raise AssertionError("No se detectó el conflicto de versiones")
+        b.sincronizar()
+        assert b.obtener(1)["nombre"] == "Ana María"
+    finally:
+        a.cerrar()
+        b.cerrar()
+
+
+def comprobar_deshacer_tras_conflicto(almacen):
+    """Una operación que ya no se puede deshacer no bloquea las anteriores"""
+    a, b = abrir(almacen), abrir(almacen)
+    try:
+        a.agregar("Ana", "Física", 1)
+        a.agregar("Bruno", "Química", 2)
+        b.sincronizar()
+        b.actualizar(2, nombre="Bruno Alberto")
+        try:
+            a.deshacer()
+        except ConflictoVersionError:
+            pass
+        else:
+            raise AssertionError("Se deshizo un alta que otra instancia modificó")
+        assert a.deshacer() == 1 and numeros(a) == [2], f"A quedó con {numeros(a)}"
+        assert not a.historial.puede_deshacer
+    finally:
+        a.cerrar()
+        b.cerrar()
+
+
+def comprobar_transaccion_tras_cambio_ajeno(almacen):
+    """Una transacción parte de los datos al día aunque B aún no haya sincronizado"""
+    a, b = abrir(almacen), abrir(almacen)
+    try:
+        a.agregar("Ana", "Física", 1)
+        a.agregar("Bruno", "Física", 2)
+        b.sincronizar()
+        a.actualizar(1, nombre="Ana María")
+        assert b.renombrar_especialidad("física", "Física Aplicada") == 2
+        a.sincronizar()
+        assert a.obtener(1)["nombre"] == "Ana María"
+        assert a.obtener(1)["especialidad"] == "Física Aplicada"
+    finally:
+        a.cerrar()
+        b.cerrar()
+
+
+def comprobar_exportacion_concurrente(almacen):
+    """A exporta en otro hilo cambios de B sin alterar lo que recorre su hilo principal"""
+    a, b = abrir(almacen), abrir(almacen)
+    try:
+        a.agregar_lote({"nombre": f"Docente {n}", "especialidad": "A", "numero_empleado": n}
+                       for n in range(1, TAMANO_LOTE + 1))
+        b.sincronizar()
+        b.agregar_lote({"nombre": f"Docente {n}", "especialidad": "B", "numero_empleado": n}
+                       for n in range(TAMANO_LOTE + 1, 2 * TAMANO_LOTE + 1))
+        errores = []
+        hilo = threading.Thread(target=lambda: errores.append(a.exportar_datos()[1]))
+        # Cambios de hilo frecuentes para que ambos hilos se intercalen
+        intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        hilo.start()
+        try:
+            while hilo.is_alive():
+                # Recorrido paso a paso, como el de una página o una búsqueda
+                for _ in a.almacen.numeros():
+                    pass
+        finally:
+            # Aunque el recorrido falle, la exportación no debe seguir
+            # escribiendo después de salir del directorio temporal
+            hilo.join()
+            sys.setswitchinterval(intervalo)
+        assert errores == [{}], f"La exportación falló: {errores}"
+        a.sincronizar()
+        assert numeros(a) == list(range(1, 2 * TAMANO_LOTE + 1)), "A no incorporó el lote de B"
+    finally:
+        a.cerrar()
+        b.cerrar()
+    nueva = abrir(almacen)
+    try:
+        assert len(nueva.almacen) == 2 * TAMANO_LOTE, f"Una instancia nueva ve {len(nueva.almacen)}"
+    finally:
+        nueva.cerrar()
+
+
+COMPROBACIONES = (comprobar_compactacion_ajena, comprobar_conflicto, comprobar_deshacer_tras_conflicto,
+                  comprobar_transaccion_tras_cambio_ajeno, comprobar_exportacion_concurrente)
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Comprobaciones de acceso concurrente")
+    parser.add_argument("--almacenes", nargs="+", choices=ALMACENES, default=ALMACENES)
+    argumentos = parser.parse_args()
+
+    directorio_original = os.getcwd()
+    for almacen in argumentos.almacenes:
+        for comprobar in COMPROBACIONES:
+            with tempfile.TemporaryDirectory(prefix="concurrencia_docentes_") as directorio:
+                os.chdir(directorio)
+                try:
+                    comprobar(almacen)
+                finally:
+                    os.chdir(directorio_original)
+            print(f"✓ {comprobar.__name__} ({almacen})")
+
+
+if __name__ == "__main__":
+    main()
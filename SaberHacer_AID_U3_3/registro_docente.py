@@ -0,0 +1,110 @@
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+# Fechas guardadas como microsegundos desde esta época (sin zona horaria)
+EPOCA = datetime(1970, 1, 1)
+MICROSEGUNDO = timedelta(microseconds=1)
+# Marca de un campo opcional que el docente no tiene
+_AUSENTE = object()
+
+
+def fecha_a_entero(fecha):
+    """Convierte una fecha ISO a microsegundos si la conversión es reversible
+
+    Los textos que no vuelven a producirse idénticos con `isoformat` (otro
+    formato, zona horaria...) se conservan tal cual.
+    """
+    try:
+        valor = datetime.fromisoformat(fecha)
+    except ValueError:
+        return fecha
+    if valor.tzinfo is not None or valor.isoformat() != fecha:
+        return fecha
+    return (valor - EPOCA) // MICROSEGUNDO
+
+
+def entero_a_fecha(valor):
+    """Inverso de fecha_a_entero"""
+    if type(valor) is str:
+        return valor
+    return (EPOCA + valor * MICROSEGUNDO).isoformat()
+
+
+class Docente(Mapping):
+    """Registro compacto e inmutable de un docente
+
+    Se comporta como un diccionario de solo lectura con las mismas claves
+    que el JSON (`nombre`, `especialidad`, `numero_empleado`,
+    `fecha_registro` y `fecha_actualizacion` si las tiene, más cualquier
+    otra clave recibida), pero sin una tabla hash por docente: los campos
+    van en slots, la especialidad se interna y las fechas ISO se guardan
+    como enteros. Las claves adicionales, y las fechas que no sean texto,
+    van a un diccionario aparte. `json.dumps(..., default=dict)` lo
+    serializa.
+    """
+
+    __slots__ = ("nombre", "especialidad", "numero_empleado", "_registro", "_actualizacion", "_extra")
+
+    def __init__(self, nombre, especialidad, numero_empleado, fecha_registro=_AUSENTE,
+                 fecha_actualizacion=_AUSENTE, extra=None):
+        self.nombre = nombre
+        self.especialidad = sys.intern(especialidad) if type(especialidad) is str else especialidad
+        self.numero_empleado = numero_empleado
+        self._registro = _AUSENTE if fecha_registro is _AUSENTE else fecha_a_entero(fecha_registro)
+        self._actualizacion = (_AUSENTE if fecha_actualizacion is _AUSENTE
+                               else fecha_a_entero(fecha_actualizacion))
+        self._extra = extra or None
+
+    @classmethod
+    def desde_mapeo(cls, docente):
+        """Registro a partir de un diccionario (o de otro Docente, que se reutiliza)"""
+        if type(docente) is cls:
+            return docente
+        fechas = {}
+        extra = {}
+        for clave, valor in docente.items():
+            if clave in FECHAS and type(valor) is str:
+                fechas[clave] = valor
+            elif clave not in CAMPOS:
+                extra[clave] = valor
+        return cls(docente['nombre'], docente['especialidad'], docente['numero_empleado'],
+                   fechas.get('fecha_registro', _AUSENTE),
+                   fechas.get('fecha_actualizacion', _AUSENTE), extra)
+
+    def __getitem__(self, clave):
+        if clave == 'nombre':
+            return self.nombre
+        if clave == 'especialidad':
+            return self.especialidad
+        if clave == 'numero_empleado':
+            return self.numero_empleado
+        if clave == 'fecha_registro' and self._registro is not _AUSENTE:
+            return entero_a_fecha(self._registro)
+        if clave == 'fecha_actualizacion' and self._actualizacion is not _AUSENTE:
+            return entero_a_fecha(self._actualizacion)
+        if self._extra is not None:
+            return self._extra[clave]
+        raise KeyError(clave)
+
+    def __iter__(self):
+        yield 'nombre'
+        yield 'especialidad'
+        yield 'numero_empleado'
+        if self._registro is not _AUSENTE:
+            yield 'fecha_registro'
+        if self._actualizacion is not _AUSENTE:
+            yield 'fecha_actualizacion'
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self):
+        return (3 + (self._registro is not _AUSENTE) + (self._actualizacion is not _AUSENTE)
+                + (len(self._extra) if self._extra is not None else 0))
+
+    def __repr__(self):
+        return f"Docente({dict(self)!r})"
+
+
+CAMPOS = frozenset(('nombre', 'especialidad', 'numero_empleado'))
+FECHAS = frozenset(('fecha_registro', 'fecha_actualizacion'))
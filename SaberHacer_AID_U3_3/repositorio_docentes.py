@@ -0,0 +1,443 @@
+from itertools import islice
+
+from estadisticas import AgregadorEstadisticas
+from registro_docente import Docente
+
+TAMANO_NGRAMA = 3
+
+
+def normalizar(texto):
+    """Normaliza un texto para comparaciones sin distinguir mayúsculas"""
+    return texto.casefold()
+
+
+def clave_orden(columna):
+    """Función de ordenamiento de los docentes por una columna"""
+    if columna == "numero_empleado":
+        return lambda docente: docente['numero_empleado']
+    return lambda docente: normalizar(str(docente.get(columna) or ""))
+
+
+def trigramas(texto):
+    """Conjunto de n-gramas de un texto ya normalizado"""
+    return {texto[i:i + TAMANO_NGRAMA] for i in range(len(texto) - TAMANO_NGRAMA + 1)}
+
+
+class IndiceTrigramas:
+    """Índice invertido de trigramas para búsquedas por subcadena"""
+
+    def __init__(self):
+        self._postings = {}
+
+    def agregar(self, clave, texto):
+        for trigrama in trigramas(texto):
+            self._postings.setdefault(trigrama, set()).add(clave)
+
+    def quitar(self, clave, texto):
+        for trigrama in trigramas(texto):
+            claves = self._postings.get(trigrama)
+            if claves is None:
+                continue
+            claves.discard(clave)
+            if not claves:
+                del self._postings[trigrama]
+
+    def candidatos(self, subcadena):
+        """Claves que contienen todos los trigramas de la subcadena
+
+        Devuelve None si la subcadena es más corta que un trigrama y el
+        índice no puede acotar la búsqueda.
+        """
+        consulta = trigramas(subcadena)
+        if not consulta:
+            return None
+        postings = []
+        for trigrama in consulta:
+            claves = self._postings.get(trigrama)
+            if not claves:
+                return set()
+            postings.append(claves)
+        postings.sort(key=len)
+        resultado = set(postings[0])
+        for claves in postings[1:]:
+            resultado &= claves
+            if not resultado:
+                break
+        return resultado
+
+
+class IndicesBusqueda:
+    """Índices secundarios de las búsquedas sobre un conjunto de docentes
+
+    Se construyen recorriendo los docentes una vez y después reciben cada
+    cambio con `aplicar`.
+    """
+
+    def __init__(self, docentes=()):
+        # Posición de inserción de cada docente, para ordenar resultados
+        self.orden = {}
+        self._secuencia = 0
+        # Docentes por especialidad normalizada
+        self.por_especialidad = {}
+        # Índices de trigramas: nombre por docente y especialidad por valor normalizado
+        self.trigramas_nombre = IndiceTrigramas()
+        self.trigramas_especialidad = IndiceTrigramas()
+        for docente in docentes:
+            self._agregar(docente)
+
+    def aplicar(self, anterior, docente):
+        """Refleja un alta (sin anterior), un cambio o una baja (sin docente)"""
+        if anterior is not None:
+            self._quitar(anterior)
+            if docente is None:
+                del self.orden[anterior['numero_empleado']]
+        if docente is not None:
+            self._agregar(docente)
+
+    def _agregar(self, docente):
+        numero = docente['numero_empleado']
+        if numero not in self.orden:
+            self.orden[numero] = self._secuencia
+            self._secuencia += 1
+        normalizada = normalizar(docente['especialidad'])
+        if normalizada not in self.por_especialidad:
+            self.por_especialidad[normalizada] = {}
+            self.trigramas_especialidad.agregar(normalizada, normalizada)
+        self.por_especialidad[normalizada][numero] = None
+        self.trigramas_nombre.agregar(numero, normalizar(docente['nombre']))
+
+    def _quitar(self, docente):
+        numero = docente['numero_empleado']
+        normalizada = normalizar(docente['especialidad'])
+        numeros = self.por_especialidad.get(normalizada)
+        if numeros is not None:
+            numeros.pop(numero, None)
+            if not numeros:
+                del self.por_especialidad[normalizada]
+                self.trigramas_especialidad.quitar(normalizada, normalizada)
+        self.trigramas_nombre.quitar(numero, normalizar(docente['nombre']))
+
+
+class RepositorioDocentes:
+    """Almacén de docentes indexado por número de empleado
+
+    Los docentes pueden venir de una instantánea binaria (`base`), que se
+    abre sin decodificar nada, más una capa en memoria con los docentes
+    nuevos, los modificados y los eliminados desde entonces. En memoria se
+    guardan como registros `Docente` compactos. Los índices
+    secundarios se construyen la primera vez que se necesitan (o antes, en
+    otro hilo, con `preparar_indices`) y a partir de ahí se mantienen al
+    vuelo. Las estadísticas van aparte: parten de los
+    totales guardados en la instantánea más la capa de cambios, sin
+    decodificar a todos los docentes.
+    """
+
+    def __init__(self, docentes=None):
+        self._limpiar()
+        if docentes:
+            self.cargar(docentes)
+
+    def _limpiar(self, base=None):
+        # Instantánea de solo lectura y capa de cambios encima
+        self._base = base
+        self._nuevos = {}
+        self._modificados = {}
+        self._eliminados = set()
+        self._total = len(base) if base is not None else 0
+        # Índices de búsqueda; None hasta que se construyen
+        self._indices = None
+        # Cambios hechos mientras otro hilo construye los índices
+        self._cambios_pendientes = None
+        # Totales para el panel de estadísticas; None hasta que se piden
+        self._estadisticas = None
+
+    def cargar(self, docentes):
+        """Reemplaza el contenido con una lista de docentes"""
+        self._limpiar()
+        for docente in docentes:
+            docente = Docente.desde_mapeo(docente)
+            if docente.numero_empleado not in self._nuevos:
+                self._total += 1
+            self._nuevos[docente.numero_empleado] = docente
+
+    def abrir_base(self, base):
+        """Reemplaza el contenido con una instantánea binaria, sin decodificarla"""
+        self._limpiar(base)
+
+    @property
+    def indices_listos(self):
+        return self._indices is not None
+
+    def _asegurar_indices(self):
+        """Índices secundarios, construidos aquí mismo si todavía no existen"""
+        if self._indices is None:
+            self._indices = IndicesBusqueda(self.listar())
+            self._cambios_pendientes = None
+        return self._indices
+
+    def preparar_indices(self, bloqueo):
+        """Construye los índices en el hilo que llama, sin retener `bloqueo`
+
+        `bloqueo` es el que protege las mutaciones: solo se toma para
+        congelar el contenido y para instalar los índices. Los cambios
+        hechos mientras tanto se anotan y se reproducen al instalarlos. Si
+        entretanto se construyeron por otro camino o se reemplazó el
+        contenido, el resultado se descarta.
+        """
+        with bloqueo:
+            if self._indices is not None:
+                return
+            vista = self.congelar()
+            pendientes = self._cambios_pendientes = []
+        indices = IndicesBusqueda(vista.listar())
+        with bloqueo:
+            if self._indices is not None or self._cambios_pendientes is not pendientes:
+                return
+            for anterior, docente in pendientes:
+                indices.aplicar(anterior, docente)
+            self._indices = indices
+            self._cambios_pendientes = None
+
+    @property
+    def estadisticas(self):
+        if self._estadisticas is None:
+            self._estadisticas = self._calcular_estadisticas()
+        return self._estadisticas
+
+    def _calcular_estadisticas(self):
+        """Totales de la instantánea corregidos con la capa de cambios
+
+        Si la instantánea no trae totales (formatos anteriores) o no hay
+        instantánea, se recorren todos los docentes.
+        """
+        agregador = self._base.estadisticas() if self._base is not None else None
+        if agregador is None:
+            agregador = AgregadorEstadisticas()
+            for docente in self.listar():
+                agregador.registrar(docente)
+            return agregador
+        for numero in self._eliminados:
+            agregador.retirar(self._base.obtener(numero))
+        for numero, docente in self._modificados.items():
+            agregador.retirar(self._base.obtener(numero))
+            agregador.registrar(docente)
+        for docente in self._nuevos.values():
+            agregador.registrar(docente)
+        return agregador
+
+    def _reflejar(self, anterior, docente):
+        """Lleva un alta, cambio o baja a las estadísticas y a los índices"""
+        if self._estadisticas is not None:
+            if anterior is not None:
+                self._estadisticas.retirar(anterior)
+            if docente is not None:
+                self._estadisticas.registrar(docente)
+        if self._indices is not None:
+            self._indices.aplicar(anterior, docente)
+        elif self._cambios_pendientes is not None:
+            self._cambios_pendientes.append((anterior, docente))
+
+    def _en_base(self, numero_empleado):
+        return self._base is not None and self._base.contiene(numero_empleado)
+
+    def existe(self, numero_empleado):
+        """Indica si existe un docente con ese número de empleado (sin decodificarlo)"""
+        if numero_empleado in self._nuevos or numero_empleado in self._modificados:
+            return True
+        return numero_empleado not in self._eliminados and self._en_base(numero_empleado)
+
+    def obtener(self, numero_empleado):
+        """Devuelve el docente con ese número de empleado o None"""
+        docente = self._nuevos.get(numero_empleado)
+        if docente is not None:
+            return docente
+        if numero_empleado in self._eliminados:
+            return None
+        docente = self._modificados.get(numero_empleado)
+        if docente is not None:
+            return docente
+        if self._base is not None:
+            return self._base.obtener(numero_empleado)
+        return None
+
+    def agregar(self, docente):
+        """Agrega un docente nuevo; devuelve False si el número ya existe"""
+        docente = Docente.desde_mapeo(docente)
+        numero = docente.numero_empleado
+        if self.existe(numero):
+            return False
+        if numero in self._eliminados:
+            # Vuelve a darse de alta un docente de la instantánea
+            self._eliminados.discard(numero)
+            self._modificados[numero] = docente
+        else:
+            self._nuevos[numero] = docente
+        self._total += 1
+        self._reflejar(None, docente)
+        return True
+
+    def actualizar(self, numero_empleado, cambios):
+        """Reemplaza el docente por una copia con los cambios y la devuelve (None si no existe)
+
+        El registro anterior no se modifica, así que las copias de la lista
+        tomadas por el hilo de exportación siguen siendo consistentes.
+        """
+        anterior = self.obtener(numero_empleado)
+        if anterior is None:
+            return None
+        return self._sustituir(anterior, Docente.desde_mapeo({**anterior, **cambios}))
+
+    def reemplazar(self, docente):
+        """Guarda el docente completo: lo agrega o sustituye al que tenga su número
+
+        Devuelve el docente anterior, o None si no existía.
+        """
+        docente = Docente.desde_mapeo(docente)
+        anterior = self.obtener(docente.numero_empleado)
+        if anterior is None:
+            self.agregar(docente)
+        else:
+            self._sustituir(anterior, docente)
+        return anterior
+
+    def _sustituir(self, anterior, docente):
+        numero_empleado = docente.numero_empleado
+        if numero_empleado in self._nuevos:
+            self._nuevos[numero_empleado] = docente
+        else:
+            self._modificados[numero_empleado] = docente
+        self._reflejar(anterior, docente)
+        return docente
+
+    def eliminar(self, numero_empleado):
+        """Elimina el docente y lo devuelve (None si no existe)"""
+        docente = self.obtener(numero_empleado)
+        if docente is None:
+            return None
+        if numero_empleado in self._nuevos:
+            del self._nuevos[numero_empleado]
+        else:
+            self._modificados.pop(numero_empleado, None)
+            self._eliminados.add(numero_empleado)
+        self._total -= 1
+        self._reflejar(docente, None)
+        return docente
+
+    def _vista(self):
+        # Vista sobre el estado vivo: no debe mutarse mientras se recorre
+        return VistaRepositorio(self._base, self._nuevos, self._modificados,
+                                self._eliminados, self._total)
+
+    def listar(self):
+        """Itera los docentes en orden de inserción"""
+        return self._vista().listar()
+
+    def numeros(self):
+        """Itera los números de empleado en orden de inserción"""
+        return self._vista().numeros()
+
+    def pagina(self, inicio, cantidad):
+        """Docentes de una página del listado; solo decodifica esos docentes"""
+        return [self.obtener(n) for n in islice(self.numeros(), inicio, inicio + cantidad)]
+
+    def copiar(self):
+        """Repositorio independiente con el mismo contenido, sin índices ni estadísticas
+
+        Comparte la instantánea base, que es de solo lectura, y copia la
+        capa de cambios.
+        """
+        copia = RepositorioDocentes()
+        copia._limpiar(self._base)
+        copia._nuevos = dict(self._nuevos)
+        copia._modificados = dict(self._modificados)
+        copia._eliminados = set(self._eliminados)
+        copia._total = self._total
+        return copia
+
+    def numeros_ordenados(self, columna, descendente=False):
+        """Números de empleado de todos los docentes ordenados por una columna
+
+        Por número no hace falta decodificar a nadie; por otra columna se
+        recorren todos los docentes y solo se conservan los números.
+        """
+        if columna == "numero_empleado":
+            return sorted(self.numeros(), reverse=descendente)
+        clave = clave_orden(columna)
+        docentes = sorted(self.listar(), key=clave, reverse=descendente)
+        return [d['numero_empleado'] for d in docentes]
+
+    def congelar(self):
+        """Vista inmutable del contenido actual
+
+        Copia solo la capa de cambios, así que es barata de tomar bajo un
+        bloqueo; el hilo de exportación la recorre después sin bloquear.
+        """
+        return VistaRepositorio(self._base, dict(self._nuevos), dict(self._modificados),
+                                frozenset(self._eliminados), self._total)
+
+    def _ordenados(self, indices, numeros):
+        """Docentes de esos números en orden de inserción"""
+        return [self.obtener(n) for n in sorted(numeros, key=indices.orden.__getitem__)]
+
+    def buscar_por_nombre(self, texto):
+        """Docentes cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        indices = self._asegurar_indices()
+        consulta = normalizar(texto)
+        candidatos = indices.trigramas_nombre.candidatos(consulta)
+        if candidatos is None:
+            return [d for d in self.listar() if consulta in normalizar(d['nombre'])]
+        docentes = ((n, self.obtener(n)) for n in candidatos)
+        numeros = [n for n, d in docentes if consulta in normalizar(d['nombre'])]
+        return self._ordenados(indices, numeros)
+
+    def buscar_por_especialidad(self, texto):
+        """Docentes cuya especialidad contiene el texto (sin distinguir mayúsculas)"""
+        indices = self._asegurar_indices()
+        consulta = normalizar(texto)
+        claves = indices.trigramas_especialidad.candidatos(consulta)
+        if claves is None:
+            claves = indices.por_especialidad
+        numeros = []
+        for clave in claves:
+            if consulta in clave:
+                numeros.extend(indices.por_especialidad[clave])
+        return self._ordenados(indices, numeros)
+
+    def __len__(self):
+        return self._total
+
+    def __iter__(self):
+        return self.listar()
+
+
+class VistaRepositorio:
+    """Recorrido de la instantánea base más la capa de cambios"""
+
+    def __init__(self, base, nuevos, modificados, eliminados, total):
+        self._base = base
+        self._nuevos = nuevos
+        self._modificados = modificados
+        self._eliminados = eliminados
+        self._total = total
+
+    def __len__(self):
+        return self._total
+
+    def numeros(self):
+        if self._base is not None:
+            for numero in self._base.numeros():
+                if numero not in self._eliminados:
+                    yield numero
+        yield from self._nuevos
+
+    def listar(self):
+        if self._base is not None:
+            for docente in self._base:
+                numero = docente['numero_empleado']
+                if numero in self._eliminados:
+                    continue
+                yield self._modificados.get(numero, docente)
+        yield from self._nuevos.values()
+
+    def __iter__(self):
+        return self.listar()
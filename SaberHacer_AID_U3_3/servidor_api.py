@@ -0,0 +1,334 @@
+"""Servidor HTTP/1.1 con la API REST de docentes (solo biblioteca estándar)
+
+Rutas:
+    GET    /docentes?inicio=0&cantidad=100         lista paginada
+    POST   /docentes                               alta (JSON con nombre, especialidad, numero_empleado)
+    GET    /docentes/buscar?criterio=nombre&valor=  búsqueda avanzada
+    GET    /docentes/<numero>                      consulta
+    GET    /docentes/<numero>/version              versión actual del docente
+    PUT    /docentes/<numero>?version=N            actualización (JSON con nombre y/o especialidad)
+    DELETE /docentes/<numero>?version=N            eliminación
+    GET    /estadisticas                           resumen de estadísticas
+
+Con `version`, PUT y DELETE responden 409 si otra instancia cambió el docente.
+
+Uso: python servidor_api.py [--host 127.0.0.1] [--puerto 8000]
+"""
+import argparse
+import asyncio
+import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qs
+
+from nucleo_docentes import (NucleoDocentes, ErrorDocentes, ValidacionError,
+                             DocenteNoEncontradoError, DocenteDuplicadoError, ConflictoVersionError,
+                             validar_numero)
+
+# Límites de la petición y de la conexión
+TAMANO_MAXIMO_CUERPO = 1024 * 1024
+TAMANO_MAXIMO_LINEA = 8 * 1024
+MAXIMO_CABECERAS = 100
+ESPERA_INACTIVA = 15.0
+# Página por defecto y máxima de los listados
+CANTIDAD_POR_DEFECTO = 100
+CANTIDAD_MAXIMA = 1000
+# Segundos entre revisiones de las exportaciones terminadas
+INTERVALO_REVISION_EXPORTACIONES = 1.0
+
+CODIGOS_ERROR = (
+    (ValidacionError, HTTPStatus.BAD_REQUEST),
+    (DocenteNoEncontradoError, HTTPStatus.NOT_FOUND),
+    (DocenteDuplicadoError, HTTPStatus.CONFLICT),
+    (ConflictoVersionError, HTTPStatus.CONFLICT),
+)
+
+
+class ErrorHTTP(Exception):
+    """Error que se responde directamente con un código HTTP"""
+
+    def __init__(self, estado, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def codigo_para(error):
+    """Código HTTP que corresponde a un error del núcleo"""
+    for tipo, estado in CODIGOS_ERROR:
+        if isinstance(error, tipo):
+            return estado
+    return HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+def entero_de_consulta(consulta, nombre, por_defecto, minimo, maximo):
+    valores = consulta.get(nombre)
+    if not valores:
+        return por_defecto
+    try:
+        valor = int(valores[0])
+    except ValueError:
+        raise ValidacionError(f"El parámetro '{nombre}' debe ser un número entero")
+    return max(minimo, min(valor, maximo))
+
+
+def version_de_consulta(consulta):
+    """Versión esperada del parámetro `version`, o None si no se indicó"""
+    valores = consulta.get("version")
+    if not valores:
+        return None
+    try:
+        return int(valores[0])
+    except ValueError:
+        raise ValidacionError("El parámetro 'version' debe ser un número entero")
+
+
+class ServidorDocentes:
+    """Atiende peticiones HTTP sobre un NucleoDocentes
+
+    Las operaciones sobre el núcleo se ejecutan en `ejecutor`, de un solo
+    hilo: el bucle de eventos sigue atendiendo las demás conexiones mientras
+    una petición espera bloqueos de archivo, escrituras a disco o búsquedas,
+    y las peticiones nunca llaman al núcleo a la vez aunque haya muchos
+    clientes. Los hilos del núcleo (exportación e índices) no modifican los
+    datos que leen las peticiones: trabajan sobre copias y se coordinan con
+    el bloqueo del almacenamiento.
+    """
+
+    def __init__(self, nucleo, ejecutor):
+        self.nucleo = nucleo
+        self.ejecutor = ejecutor
+
+    # --- Rutas ---
+
+    def despachar(self, metodo, ruta, consulta, cuerpo):
+        """Devuelve (estado, datos) para la petición"""
+        partes = [p for p in ruta.split("/") if p]
+        if partes == ["estadisticas"]:
+            self._exigir_metodo(metodo, "GET")
+            return HTTPStatus.OK, self.nucleo.resumen_estadisticas()
+        if partes == ["docentes"]:
+            if metodo == "GET":
+                return HTTPStatus.OK, self.listar(consulta)
+            self._exigir_metodo(metodo, "POST")
+            datos = self._leer_objeto(cuerpo)
+            docente = self.nucleo.agregar(datos.get("nombre"), datos.get("especialidad"),
+                                          datos.get("numero_empleado"))
+            return HTTPStatus.CREATED, docente
+        if partes == ["docentes", "buscar"]:
+            self._exigir_metodo(metodo, "GET")
+            return HTTPStatus.OK, self.buscar(consulta)
+        if len(partes) == 2 and partes[0] == "docentes":
+            numero = partes[1]
+            if metodo == "GET":
+                return HTTPStatus.OK, self.nucleo.obtener(numero)
+            if metodo in ("PUT", "PATCH"):
+                datos = self._leer_objeto(cuerpo)
+                docente = self.nucleo.actualizar(numero, datos.get("nombre"), datos.get("especialidad"),
+                                                 version_de_consulta(consulta))
+                return HTTPStatus.OK, docente
+            self._exigir_metodo(metodo, "DELETE")
+            return HTTPStatus.OK, self.nucleo.eliminar(numero, version_de_consulta(consulta))
+        if len(partes) == 3 and partes[0] == "docentes" and partes[2] == "version":
+            self._exigir_metodo(metodo, "GET")
+            numero = validar_numero(partes[1])
+            return HTTPStatus.OK, {"numero_empleado": numero, "version": self.nucleo.version_de(numero)}
+        raise ErrorHTTP(HTTPStatus.NOT_FOUND, f"Ruta no encontrada: {ruta}")
+
+    def listar(self, consulta):
+        inicio = entero_de_consulta(consulta, "inicio", 0, 0, len(self.nucleo.almacen))
+        cantidad = entero_de_consulta(consulta, "cantidad", CANTIDAD_POR_DEFECTO, 0, CANTIDAD_MAXIMA)
+        docentes = self.nucleo.almacen.pagina(inicio, cantidad)
+        return {"total": len(self.nucleo.almacen), "inicio": inicio, "docentes": docentes}
+
+    def buscar(self, consulta):
+        criterio = consulta.get("criterio", ["nombre"])[0]
+        valor = consulta.get("valor", [""])[0]
+        resultados = self.nucleo.buscar_avanzado(criterio, valor)
+        inicio = entero_de_consulta(consulta, "inicio", 0, 0, len(resultados))
+        cantidad = entero_de_consulta(consulta, "cantidad", CANTIDAD_POR_DEFECTO, 0, CANTIDAD_MAXIMA)
+        return {"total": len(resultados), "inicio": inicio,
+                "docentes": resultados[inicio:inicio + cantidad]}
+
+    @staticmethod
+    def _exigir_metodo(metodo, esperado):
+        if metodo != esperado:
+            raise ErrorHTTP(HTTPStatus.METHOD_NOT_ALLOWED, f"Método no permitido: {metodo}")
+
+    @staticmethod
+    def _leer_objeto(cuerpo):
+        try:
+            datos = json.loads(cuerpo.decode('utf-8') or "null")
+        except (UnicodeDecodeError, ValueError):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "El cuerpo no es JSON válido")
+        if not isinstance(datos, dict):
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "El cuerpo debe ser un objeto JSON")
+        return datos
+
+    # --- Protocolo HTTP ---
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión; la mantiene abierta entre peticiones (keep-alive)"""
+        try:
+            while True:
+                try:
+                    peticion = await asyncio.wait_for(self._leer_peticion(lector), ESPERA_INACTIVA)
+                except ErrorHTTP as e:
+                    await self._responder(escritor, e.estado, {"error": str(e)}, mantener=False)
+                    break
+                if peticion is None:
+                    break
+                metodo, destino, mantener, cuerpo = peticion
+                estado, datos = await asyncio.get_running_loop().run_in_executor(
+                    self.ejecutor, self._resolver, metodo, destino, cuerpo)
+                await self._responder(escritor, estado, datos, mantener)
+                if not mantener:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            escritor.close()
+
+    def _resolver(self, metodo, destino, cuerpo):
+        partes = urlsplit(destino)
+        try:
+            return self.despachar(metodo, partes.path, parse_qs(partes.query), cuerpo)
+        except ErrorHTTP as e:
+            return e.estado, {"error": str(e)}
+        except ErrorDocentes as e:
+            return codigo_para(e), {"error": str(e)}
+        except Exception as e:
+            print(f"✗ Error interno atendiendo {metodo} {destino}: {e}")
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": "Error interno del servidor"}
+
+    async def _leer_peticion(self, lector):
+        """Lee una petición; devuelve None si el cliente cerró la conexión"""
+        linea = await self._leer_linea(lector)
+        if not linea:
+            return None
+        try:
+            metodo, destino, version = linea.decode('latin-1').split()
+        except ValueError:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Línea de petición inválida")
+        if version not in ("HTTP/1.0", "HTTP/1.1"):
+            raise ErrorHTTP(HTTPStatus.HTTP_VERSION_NOT_SUPPORTED, f"Versión no soportada: {version}")
+
+        cabeceras = {}
+        while True:
+            linea = await self._leer_linea(lector)
+            if linea in (b"", b"\r\n", b"\n"):
+                break
+            if len(cabeceras) >= MAXIMO_CABECERAS:
+                raise ErrorHTTP(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Demasiadas cabeceras")
+            nombre, separador, valor = linea.decode('latin-1').partition(":")
+            if not separador:
+                raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Cabecera inválida")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+
+        if "transfer-encoding" in cabeceras:
+            raise ErrorHTTP(HTTPStatus.NOT_IMPLEMENTED, "Transfer-Encoding no soportado")
+        try:
+            longitud = int(cabeceras.get("content-length", "0"))
+        except ValueError:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if longitud < 0:
+            raise ErrorHTTP(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+        if longitud > TAMANO_MAXIMO_CUERPO:
+            raise ErrorHTTP(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Cuerpo demasiado grande")
+        cuerpo = await lector.readexactly(longitud) if longitud else b""
+
+        conexion = cabeceras.get("connection", "").lower()
+        if version == "HTTP/1.1":
+            mantener = conexion != "close"
+        else:
+            mantener = conexion == "keep-alive"
+        return metodo.upper(), destino, mantener, cuerpo
+
+    @staticmethod
+    async def _leer_linea(lector):
+        try:
+            return await lector.readuntil(b"\n")
+        except asyncio.IncompleteReadError as e:
+            return e.partial
+        except asyncio.LimitOverrunError:
+            raise ErrorHTTP(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Línea demasiado larga")
+
+    @staticmethod
+    async def _responder(escritor, estado, datos, mantener):
+        cuerpo = json.dumps(datos, ensure_ascii=False, default=dict).encode('utf-8')
+        cabeceras = (
+            f"HTTP/1.1 {estado.value} {estado.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if mantener else 'close'}\r\n"
+            "\r\n"
+        )
+        escritor.write(cabeceras.encode('latin-1') + cuerpo)
+        await escritor.drain()
+
+
+async def revisar_exportaciones(nucleo, ejecutor):
+    """Vacía la cola de exportaciones terminadas e informa los errores
+
+    También incorpora, en el hilo del núcleo, los cambios que otras
+    instancias hicieron sobre los mismos datos.
+    """
+    while True:
+        await asyncio.sleep(INTERVALO_REVISION_EXPORTACIONES)
+        try:
+            if await asyncio.get_running_loop().run_in_executor(ejecutor, nucleo.sincronizar):
+                # Si se abrió la instantánea de otra instancia, los índices se rehacen
+                nucleo.preparar_indices()
+        except (ErrorDocentes, OSError, ValueError) as e:
+            print(f"✗ Error al sincronizar: {e}")
+        try:
+            while True:
+                resultado = nucleo.exportaciones.resultados.get_nowait()
+                if isinstance(resultado, Exception):
+                    print(f"✗ Error al exportar: {resultado}")
+                    continue
+                for formato, error in resultado[1].items():
+                    print(f"✗ Error al generar {formato}: {error}")
+        except queue.Empty:
+            pass
+
+
+async def servir(nucleo, ejecutor, host, puerto):
+    servidor = ServidorDocentes(nucleo, ejecutor)
+    revision = asyncio.create_task(revisar_exportaciones(nucleo, ejecutor))
+    tcp = await asyncio.start_server(servidor.atender, host, puerto, limit=TAMANO_MAXIMO_LINEA)
+    print(f"✓ API de docentes escuchando en http://{host}:{puerto}")
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        revision.cancel()
+
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="API REST de docentes")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8000)
+    argumentos = parser.parse_args()
+
+    nucleo = NucleoDocentes()
+    # El núcleo se usa siempre desde este único hilo (SQLite exige el mismo hilo)
+    ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nucleo")
+    try:
+        ejecutor.submit(nucleo.cargar_datos_desde_json).result()
+    except Exception as e:
+        print(f"✗ Error al cargar datos: {e}")
+    # Los índices de búsqueda se construyen sin frenar las peticiones
+    nucleo.preparar_indices()
+    try:
+        asyncio.run(servir(nucleo, ejecutor, argumentos.host, argumentos.puerto))
+    except KeyboardInterrupt:
+        print("✓ Servidor detenido")
+    finally:
+        ejecutor.submit(nucleo.cerrar).result()
+        ejecutor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import tkinter as tk
+from tkinter import ttk
+
+from repositorio_docentes import clave_orden
+
+# Filas que se materializan en el Treeview a la vez
+TAMANO_PAGINA = 100
+
+COLUMNAS = (
+    ("numero_empleado", "Número", 90),
+    ("nombre", "Nombre", 260),
+    ("especialidad", "Especialidad", 180),
+    ("fecha_registro", "Fecha de registro", 200),
+)
+
+
+class CursorDocentes:
+    """Cursor de solo lectura sobre los docentes del repositorio
+
+    Sin `numeros` recorre todo el repositorio, en orden de inserción o en el
+    que pida `ordenar`, que resuelve el almacenamiento página a página; así
+    se ven los docentes que se agreguen después. Con `numeros` recorre solo
+    esos docentes (por ejemplo, los de una búsqueda), descartando los que se
+    eliminen. Únicamente se decodifican los docentes de la página pedida.
+    """
+
+    def __init__(self, repositorio, numeros=None):
+        self.repositorio = repositorio
+        self.numeros = numeros
+        # (columna, descendente) del listado completo, o None
+        self.orden = None
+        # Versión de los datos con la que se depuró `numeros`
+        self._version = repositorio.version_datos
+
+    def _vigentes(self):
+        """Los números del cursor que todavía existen"""
+        version = self.repositorio.version_datos
+        if version != self._version:
+            self.numeros = [n for n in self.numeros if self.repositorio.existe(n)]
+            self._version = version
+        return self.numeros
+
+    def __len__(self):
+        if self.numeros is None:
+            return len(self.repositorio)
+        return len(self._vigentes())
+
+    def pagina(self, inicio, cantidad):
+        """Docentes de la página que empieza en `inicio`"""
+        if self.numeros is None:
+            return self.repositorio.pagina(inicio, cantidad, self.orden)
+        docentes = (self.repositorio.obtener(n) for n in self._vigentes()[inicio:inicio + cantidad])
+        return [d for d in docentes if d is not None]
+
+    def ordenar(self, columna, descendente=False):
+        """Fija el orden del cursor según una columna"""
+        if self.numeros is None:
+            self.orden = (columna, descendente)
+            return
+        clave = clave_orden(columna)
+        docentes = (self.repositorio.obtener(n) for n in self._vigentes())
+        docentes = sorted((d for d in docentes if d is not None), key=clave, reverse=descendente)
+        self.numeros = [d['numero_empleado'] for d in docentes]
+
+
+class VistaResultados(ttk.Frame):
+    """Tabla paginada de docentes que solo carga la página visible"""
+
+    def __init__(self, parent, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.cursor = None
+        self.inicio = 0
+        self.orden = None
+
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.titulo_var = tk.StringVar()
+        ttk.Label(self, textvariable=self.titulo_var).grid(row=0, column=0, columnspan=2, sticky=tk.W)
+
+        self.tabla = ttk.Treeview(self, columns=[c[0] for c in COLUMNAS], show="headings")
+        for columna, texto, ancho in COLUMNAS:
+            self.tabla.heading(columna, text=texto, command=lambda c=columna: self.ordenar_por(c))
+            self.tabla.column(columna, width=ancho, anchor=tk.W)
+        self.tabla.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        barra = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.tabla.yview)
+        barra.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.tabla.configure(yscrollcommand=barra.set)
+
+        paginador = ttk.Frame(self)
+        paginador.grid(row=2, column=0, columnspan=2, pady=(5, 0))
+        self.btn_anterior = ttk.Button(paginador, text="◀ Anterior", command=self.pagina_anterior)
+        self.btn_anterior.grid(row=0, column=0, padx=2)
+        self.pagina_var = tk.StringVar()
+        ttk.Label(paginador, textvariable=self.pagina_var).grid(row=0, column=1, padx=10)
+        self.btn_siguiente = ttk.Button(paginador, text="Siguiente ▶", command=self.pagina_siguiente)
+        self.btn_siguiente.grid(row=0, column=2, padx=2)
+
+    def mostrar(self, cursor, titulo):
+        """Muestra un cursor desde su primera página"""
+        self.cursor = cursor
+        self.inicio = 0
+        self.orden = None
+        self.titulo_var.set(titulo)
+        self.refrescar()
+
+    def refrescar(self):
+        """Vuelve a cargar la página actual (por ejemplo, tras una mutación)"""
+        self.tabla.delete(*self.tabla.get_children())
+        if self.cursor is None:
+            self.pagina_var.set("")
+            return
+        total = len(self.cursor)
+        if self.inicio >= total:
+            self.inicio = max(0, (total - 1) // TAMANO_PAGINA * TAMANO_PAGINA)
+        for docente in self.cursor.pagina(self.inicio, TAMANO_PAGINA):
+            self.tabla.insert("", tk.END, values=[docente.get(c[0], "") for c in COLUMNAS])
+
+        paginas = max(1, -(-total // TAMANO_PAGINA))
+        actual = self.inicio // TAMANO_PAGINA + 1
+        self.pagina_var.set(f"Página {actual} de {paginas} ({total} docentes)")
+        self.btn_anterior.state(["!disabled"] if self.inicio > 0 else ["disabled"])
+        self.btn_siguiente.state(["!disabled"] if self.inicio + TAMANO_PAGINA < total else ["disabled"])
+
+    def pagina_siguiente(self):
+        if self.cursor is not None and self.inicio + TAMANO_PAGINA < len(self.cursor):
+            self.inicio += TAMANO_PAGINA
+            self.refrescar()
+
+    def pagina_anterior(self):
+        if self.inicio > 0:
+            self.inicio = max(0, self.inicio - TAMANO_PAGINA)
+            self.refrescar()
+
+    def ordenar_por(self, columna):
+        """Ordena por la columna; un segundo clic invierte el orden"""
+        if self.cursor is None:
+            return
+        descendente = self.orden == (columna, False)
+        self.cursor.ordenar(columna, descendente)
+        self.orden = (columna, descendente)
+        self.inicio = 0
+        self.refrescar()